@@ -0,0 +1,86 @@
+"""
+Compares the speed and accuracy of the distance engines
+on a global sample of routes between random airports.
+
+Run from the project root:
+    python -m benchmarks.distance_engines
+"""
+from time import perf_counter
+
+import numpy as np
+
+from src.models.distance import (
+    HaversineEngine,
+    UnitVectorEngine,
+    VincentyEngine,
+)
+
+AIRPORTS_COUNT = 5000
+ROUTES_COUNT = 1_000_000
+SCALAR_ROUTES_COUNT = 100_000
+
+
+def random_airports(rng: np.random.Generator, count: int):
+    """Returns airports spread uniformly over the globe."""
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+    lon = rng.uniform(-180, 180, count)
+    return lat, lon
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return result, perf_counter() - start
+
+
+def scalar_microseconds(engine, routes) -> float:
+    """Returns the mean time of one ``distance_km`` call."""
+    start = perf_counter()
+    for route in routes:
+        engine.distance_km(*route)
+    return (perf_counter() - start) / len(routes) * 1e6
+
+
+def main() -> None:
+    rng = np.random.default_rng(2024)
+    lat, lon = random_airports(rng, AIRPORTS_COUNT)
+    dep = rng.integers(0, AIRPORTS_COUNT, ROUTES_COUNT)
+    arr = rng.integers(0, AIRPORTS_COUNT, ROUTES_COUNT)
+    routes = (lat[dep], lon[dep], lat[arr], lon[arr])
+
+    reference, vincenty_time = timed(VincentyEngine().distances_km, *routes)
+    results = (
+        ("haversine", *timed(
+            HaversineEngine().route_distances_km, lat, lon, dep, arr
+        )),
+        ("unit_vector (per route)", *timed(
+            UnitVectorEngine().distances_km, *routes
+        )),
+        ("unit_vector (per airport)", *timed(
+            UnitVectorEngine().route_distances_km, lat, lon, dep, arr
+        )),
+        ("vincenty", reference, vincenty_time),
+    )
+    mask = reference > 0
+    print(f"{ROUTES_COUNT} routes between {AIRPORTS_COUNT} airports\n")
+    print(
+        f"{'engine':<27}{'routes/s':>14}"
+        f"{'mean err, %':>14}{'max err, %':>14}"
+    )
+    for name, distances, seconds in results:
+        error = np.abs(distances[mask] - reference[mask]) / reference[mask]
+        print(
+            f"{name:<27}{ROUTES_COUNT / seconds:>14,.0f}"
+            f"{error.mean() * 100:>14.4f}{error.max() * 100:>14.4f}"
+        )
+
+    scalar_routes = np.column_stack(routes)[:SCALAR_ROUTES_COUNT].tolist()
+    print(f"\nSingle flights, distance_km over {SCALAR_ROUTES_COUNT} calls\n")
+    print(f"{'engine':<27}{'us/call':>14}")
+    for engine in (HaversineEngine(), UnitVectorEngine(), VincentyEngine()):
+        microseconds = scalar_microseconds(engine, scalar_routes)
+        print(f"{engine.name:<27}{microseconds:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
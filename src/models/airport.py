@@ -2,7 +2,7 @@
 
 
 class Airport:
-    def __init__(self, icao: str, api_client) -> None:
+    def __init__(self, icao: str, api_client, airport_index=None) -> None:
         """
         Initializes an Airport object and
         retrieves data using the provided API client.
@@ -10,7 +10,12 @@ class Airport:
         :param icao: The ICAO code of the airport
         :param api_client: An instance of a client
         that implements get_metar(icao)
+        :param airport_index: An optional AirportIndex used to
+        resolve IATA codes and names and to reject unknown
+        airports before calling the API
         """
+        if airport_index is not None:
+            icao = airport_index.resolve(icao)
         self.icao: str = icao
         self.icao_code: str = "Unknown"
         self.latitude: float = 0.0
@@ -0,0 +1,243 @@
+import csv
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Any, Iterable, Iterator
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_GPS_ICAO_PATTERN = re.compile(r"^[A-Z]{4}$")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Returns an airport name in lowercase ASCII with
+    accents removed, used for name lookups.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return " ".join(_TOKEN_PATTERN.findall(stripped))
+
+
+class AirportIndex:
+    """
+    In-memory index for resolving airport identifiers.
+
+    The index keeps sorted arrays of ICAO codes, IATA codes and
+    normalized name tokens, so codes can be resolved and validated
+    locally before any request to the weather API, and prefixes can
+    be completed with a binary search.
+
+    Args:
+        airports (Iterable[dict]): Airports with "icao", "iata",
+            "name", "latitude" and "longitude" keys. Only "icao"
+            is required.
+    """
+
+    def __init__(self, airports: Iterable[dict[str, Any]]) -> None:
+        self.airports: list[dict[str, Any]] = []
+        icao_keys, iata_keys, token_keys = [], [], []
+        self._names: dict[str, list[int]] = {}
+        self._name_words: list[list[str]] = []
+
+        for airport in airports:
+            icao = (airport.get("icao") or "").strip().upper()
+            if not icao:
+                continue
+            position = len(self.airports)
+            iata = (airport.get("iata") or "").strip().upper()
+            name = airport.get("name") or ""
+            self.airports.append(
+                {
+                    "icao": icao,
+                    "iata": iata,
+                    "name": name,
+                    "latitude": airport.get("latitude"),
+                    "longitude": airport.get("longitude"),
+                }
+            )
+            icao_keys.append((icao, position))
+            if iata:
+                iata_keys.append((iata, position))
+            normalized = normalize_name(name)
+            self._name_words.append(normalized.split())
+            if normalized:
+                self._names.setdefault(normalized, []).append(position)
+                for token in set(normalized.split()):
+                    token_keys.append((token, position))
+
+        self._icao_keys, self._icao_positions = self._sorted(icao_keys)
+        self._iata_keys, self._iata_positions = self._sorted(iata_keys)
+        self._token_keys, self._token_positions = self._sorted(token_keys)
+
+    def __len__(self) -> int:
+        return len(self.airports)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "AirportIndex":
+        """
+        Builds the index from a CSV file.
+
+        Both the OurAirports layout ("type", "icao_code", "gps_code",
+        "iata_code", "name", "latitude_deg", "longitude_deg")
+        and plain "icao", "iata", "name", "latitude", "longitude"
+        columns are supported. OurAirports rows are only indexed
+        with a real ICAO code, or a "gps_code" that looks like one,
+        and closed airports are skipped; their "ident" is never used,
+        as for small fields it is a local code, not an ICAO one.
+        """
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as file:
+                rows = csv.DictReader(file)
+                airports = (cls._csv_airport(row) for row in rows)
+                return cls(
+                    airport for airport in airports if airport is not None
+                )
+        except IOError as e:
+            raise IOError(f"Error reading airport data: {e}")
+
+    @staticmethod
+    def _csv_airport(row: dict[str, str]) -> dict[str, Any] | None:
+        """
+        Maps a CSV row to an airport dictionary, or returns None
+        for closed airports and rows without an ICAO code.
+        """
+        if row.get("type") == "closed":
+            return None
+        icao = row.get("icao") or row.get("icao_code")
+        if not icao:
+            gps_code = (row.get("gps_code") or "").strip()
+            if not _GPS_ICAO_PATTERN.match(gps_code):
+                return None
+            icao = gps_code
+        latitude = row.get("latitude_deg", row.get("latitude"))
+        longitude = row.get("longitude_deg", row.get("longitude"))
+        return {
+            "icao": icao,
+            "iata": row.get("iata") or row.get("iata_code"),
+            "name": row.get("name"),
+            "latitude": float(latitude) if latitude else None,
+            "longitude": float(longitude) if longitude else None,
+        }
+
+    @staticmethod
+    def _sorted(keys: list[tuple[str, int]]) -> tuple[list[str], list[int]]:
+        """Splits sorted (key, position) pairs into two arrays."""
+        keys.sort()
+        return [key for key, _ in keys], [position for _, position in keys]
+
+    def get(self, identifier: str) -> dict[str, Any] | None:
+        """
+        Returns the airport for an ICAO code, an IATA code or
+        a full airport name in any case, or None if it is unknown
+        or shared by several airports.
+        """
+        airports = self.matches(identifier)
+        if len(airports) == 1:
+            return airports[0]
+        return None
+
+    def matches(self, identifier: str) -> list[dict[str, Any]]:
+        """
+        Returns every airport with the identifier, trying ICAO codes,
+        then IATA codes, then full names. More than one airport means
+        the identifier is ambiguous, e.g. a name like
+        "Municipal Airport".
+        """
+        key = identifier.strip().upper()
+        for keys, positions in (
+            (self._icao_keys, self._icao_positions),
+            (self._iata_keys, self._iata_positions),
+        ):
+            found = positions[
+                bisect_left(keys, key):bisect_right(keys, key)
+            ]
+            if found:
+                return [self.airports[position] for position in found]
+
+        positions = self._names.get(normalize_name(identifier), [])
+        return [self.airports[position] for position in positions]
+
+    def resolve(self, identifier: str) -> str:
+        """
+        Returns the ICAO code for an airport identifier.
+
+        Raises:
+            ValueError: If the airport is not in the index, or the
+                identifier belongs to several airports.
+        """
+        airports = self.matches(identifier)
+        if not airports:
+            raise ValueError(
+                f"The airport with ICAO code {identifier} does not exist."
+            )
+        if len(airports) > 1:
+            icao_codes = ", ".join(airport["icao"] for airport in airports)
+            raise ValueError(
+                f"The airport identifier {identifier} is ambiguous: "
+                f"{icao_codes}. Use the ICAO code."
+            )
+        return airports[0]["icao"]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        Returns up to ``limit`` airports whose ICAO code, IATA code
+        or name words start with ``prefix``.
+
+        Code matches come first, then name matches. For several
+        words, every word must start one of the words of the name.
+        """
+        code_prefix = prefix.strip().upper()
+        words = normalize_name(prefix).split()
+        candidates = []
+        if code_prefix:
+            candidates.append(
+                self._prefix_positions(
+                    self._icao_keys, self._icao_positions, code_prefix
+                )
+            )
+            candidates.append(
+                self._prefix_positions(
+                    self._iata_keys, self._iata_positions, code_prefix
+                )
+            )
+        if words:
+            candidates.append(
+                position
+                for position in self._prefix_positions(
+                    self._token_keys, self._token_positions, words[-1]
+                )
+                if self._name_matches(position, words)
+            )
+
+        matches: dict[int, None] = {}
+        for position in chain(*candidates):
+            if len(matches) >= limit:
+                break
+            matches.setdefault(position)
+        return [self.airports[position] for position in matches]
+
+    @staticmethod
+    def _prefix_positions(
+        keys: list[str], positions: list[int], prefix: str
+    ) -> Iterator[int]:
+        """
+        Yields the airport positions of the sorted keys
+        that start with ``prefix``.
+        """
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield positions[i]
+            i += 1
+
+    def _name_matches(self, position: int, words: list[str]) -> bool:
+        """
+        Checks that every word starts a word of the airport's name.
+        """
+        name_words = self._name_words[position]
+        return all(
+            any(name_word.startswith(word) for name_word in name_words)
+            for word in words
+        )
@@ -0,0 +1,393 @@
+from abc import ABC, abstractmethod
+from math import asin, atan2, cos, pi, sin, sqrt
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B_KM = WGS84_A_KM * (1 - WGS84_F)
+WGS84_MEAN_RADIUS_KM = 6371.0088
+
+_DEG_TO_RAD = pi / 180.0
+
+
+class DistanceEngine(ABC):
+    """
+    Base class for the ways of measuring the distance between airports.
+
+    Subclasses implement ``distances_km`` for NumPy arrays of
+    coordinates in degrees. ``distance_km`` measures a single pair
+    of points and validates the coordinates the same way ``Flight``
+    always has, and ``route_distances_km`` measures routes given as
+    indexes into arrays of airport coordinates.
+    """
+
+    name = ""
+
+    def distance_km(
+        self, lat1: float, lon1: float, lat2: float, lon2: float
+    ) -> float:
+        """
+        Calculates the distance between two points in kilometers.
+        """
+        self._validate(lat1, lon1, lat2, lon2)
+        return float(
+            self.distances_km(
+                np.array([lat1], dtype=np.float64),
+                np.array([lon1], dtype=np.float64),
+                np.array([lat2], dtype=np.float64),
+                np.array([lon2], dtype=np.float64),
+            )[0]
+        )
+
+    @abstractmethod
+    def distances_km(self, lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Calculates the distances between arrays of points in kilometers.
+        """
+
+    def route_distances_km(
+        self, lat, lon, dep_index, arr_index
+    ) -> np.ndarray:
+        """
+        Calculates the distances of routes between airports, where
+        ``lat`` and ``lon`` hold one entry per airport and every route
+        is a pair of positions in them.
+        """
+        return self.distances_km(
+            lat[dep_index], lon[dep_index], lat[arr_index], lon[arr_index]
+        )
+
+    @staticmethod
+    def _validate(lat1: float, lon1: float, lat2: float, lon2: float):
+        if not (-90 <= lat1 <= 90 and -90 <= lat2 <= 90):
+            raise ValueError(
+                "Latitude must be between -90 and 90 degrees."
+            )
+        if not (-180 <= lon1 <= 180 and -180 <= lon2 <= 180):
+            raise ValueError(
+                "Longitude must be between -180 and 180 degrees."
+            )
+
+
+class HaversineEngine(DistanceEngine):
+    """
+    Great-circle distance on a spherical Earth (R = 6371 km).
+
+    This is the formula ``Flight`` has always used,
+    so it is the default engine.
+    """
+
+    name = "haversine"
+
+    def distance_km(
+        self, lat1: float, lon1: float, lat2: float, lon2: float
+    ) -> float:
+        """
+        Calculates the distance between two points with the
+        scalar Haversine formula.
+        """
+        self._validate(lat1, lon1, lat2, lon2)
+        lat1_rad, lon1_rad = lat1 * _DEG_TO_RAD, lon1 * _DEG_TO_RAD
+        lat2_rad, lon2_rad = lat2 * _DEG_TO_RAD, lon2 * _DEG_TO_RAD
+        dlat, dlon = lat2_rad - lat1_rad, lon2_rad - lon1_rad
+        a = (
+            sin(dlat / 2) ** 2
+            + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2) ** 2
+        )
+        a = min(max(a, 0.0), 1.0)
+        c = 2 * atan2(sqrt(a), sqrt(1 - a))
+        return EARTH_RADIUS_KM * c
+
+    def distances_km(self, lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Calculates the distances between arrays of points
+        with the Haversine formula.
+        """
+        lat1_rad = lat1 * _DEG_TO_RAD
+        lat2_rad = lat2 * _DEG_TO_RAD
+        dlat = lat2_rad - lat1_rad
+        dlon = lon2 * _DEG_TO_RAD - lon1 * _DEG_TO_RAD
+        a = (
+            np.sin(dlat / 2) ** 2
+            + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+        )
+        a = np.clip(a, 0.0, 1.0)
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        return EARTH_RADIUS_KM * c
+
+
+class UnitVectorEngine(DistanceEngine):
+    """
+    Fast great-circle distance from airport unit vectors.
+
+    Airports are turned into unit vectors on the same sphere as
+    ``HaversineEngine``, so measuring a route only takes a vector
+    difference and one ``arcsin``. The chord between the two vectors
+    is used instead of the raw dot product, which keeps short routes
+    accurate.
+
+    ``route_distances_km`` computes the vectors once per airport and
+    gathers them by route. ``distance_km`` keeps the vectors of up to
+    ``cache_size`` airports as plain floats, dropping the oldest ones
+    when the cache is full.
+    """
+
+    name = "unit_vector"
+
+    def __init__(self, cache_size: int = 100_000) -> None:
+        self.cache_size = cache_size
+        self._vectors: dict[
+            tuple[float, float], tuple[float, float, float]
+        ] = {}
+
+    def airport_vector(
+        self, lat: float, lon: float
+    ) -> tuple[float, float, float]:
+        """
+        Returns the cached unit vector of an airport.
+        """
+        key = (lat, lon)
+        vector = self._vectors.get(key)
+        if vector is None:
+            lat_rad, lon_rad = lat * _DEG_TO_RAD, lon * _DEG_TO_RAD
+            cos_lat = cos(lat_rad)
+            vector = (
+                cos_lat * cos(lon_rad), cos_lat * sin(lon_rad), sin(lat_rad)
+            )
+            if len(self._vectors) >= self.cache_size:
+                del self._vectors[next(iter(self._vectors))]
+            self._vectors[key] = vector
+        return vector
+
+    def distance_km(
+        self, lat1: float, lon1: float, lat2: float, lon2: float
+    ) -> float:
+        """
+        Calculates the distance between two airports
+        from their cached unit vectors.
+        """
+        self._validate(lat1, lon1, lat2, lon2)
+        vectors = self._vectors
+        x1, y1, z1 = (
+            vectors.get((lat1, lon1)) or self.airport_vector(lat1, lon1)
+        )
+        x2, y2, z2 = (
+            vectors.get((lat2, lon2)) or self.airport_vector(lat2, lon2)
+        )
+        dx, dy, dz = x1 - x2, y1 - y2, z1 - z2
+        chord = sqrt(dx * dx + dy * dy + dz * dz)
+        return 2 * EARTH_RADIUS_KM * asin(min(chord / 2, 1.0))
+
+    @staticmethod
+    def unit_vectors(lat, lon) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the x, y and z components of the
+        unit vectors of arrays of points.
+        """
+        lat_rad = np.asarray(lat, dtype=np.float64) * _DEG_TO_RAD
+        lon_rad = np.asarray(lon, dtype=np.float64) * _DEG_TO_RAD
+        cos_lat = np.cos(lat_rad)
+        return (
+            cos_lat * np.cos(lon_rad),
+            cos_lat * np.sin(lon_rad),
+            np.sin(lat_rad),
+        )
+
+    def distances_km(self, lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Calculates the distances between arrays of points
+        from their unit vectors.
+        """
+        differences = [
+            component1 - component2
+            for component1, component2 in zip(
+                self.unit_vectors(lat1, lon1), self.unit_vectors(lat2, lon2)
+            )
+        ]
+        return self._arc_km(*differences)
+
+    def route_distances_km(
+        self, lat, lon, dep_index, arr_index
+    ) -> np.ndarray:
+        """
+        Calculates the distances of routes between airports from
+        unit vectors computed once per airport.
+        """
+        differences = []
+        for component in self.unit_vectors(lat, lon):
+            difference = np.take(component, dep_index)
+            difference -= np.take(component, arr_index)
+            differences.append(difference)
+        return self._arc_km(*differences)
+
+    @staticmethod
+    def _arc_km(dx: np.ndarray, dy: np.ndarray, dz: np.ndarray) -> np.ndarray:
+        """
+        Turns the differences between unit vectors into great-circle
+        distances, reusing ``dx`` and ``dy`` for the result.
+        """
+        dx *= dx
+        dy *= dy
+        dx += dy
+        np.multiply(dz, dz, out=dy)
+        dx += dy
+        np.sqrt(dx, out=dx)
+        dx *= 0.5
+        np.minimum(dx, 1.0, out=dx)
+        np.arcsin(dx, out=dx)
+        dx *= 2 * EARTH_RADIUS_KM
+        return dx
+
+
+class VincentyEngine(DistanceEngine):
+    """
+    Accurate geodesic distance on the WGS-84 ellipsoid.
+
+    Uses Vincenty's inverse formula, iterated until the longitude
+    on the auxiliary sphere changes by less than ``tolerance``.
+    Nearly antipodal points where the iteration does not converge
+    fall back to the great-circle distance on the mean
+    WGS-84 radius.
+    """
+
+    name = "vincenty"
+
+    def __init__(
+        self, tolerance: float = 1e-12, max_iterations: int = 200
+    ) -> None:
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def distances_km(self, lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Calculates the distances between arrays of points
+        on the WGS-84 ellipsoid.
+        """
+        lat1 = np.asarray(lat1, dtype=np.float64)
+        lat2 = np.asarray(lat2, dtype=np.float64)
+        lon1 = np.asarray(lon1, dtype=np.float64)
+        lon2 = np.asarray(lon2, dtype=np.float64)
+
+        f = WGS84_F
+        u1 = np.arctan((1 - f) * np.tan(lat1 * _DEG_TO_RAD))
+        u2 = np.arctan((1 - f) * np.tan(lat2 * _DEG_TO_RAD))
+        sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+        sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+        longitude = (lon2 - lon1) * _DEG_TO_RAD
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lam = longitude.copy()
+            active = np.arange(lam.shape[0])
+            for _ in range(self.max_iterations):
+                previous = lam[active]
+                lam[active] = self._next_lambda(
+                    previous,
+                    longitude[active],
+                    sin_u1[active], cos_u1[active],
+                    sin_u2[active], cos_u2[active],
+                )
+                active = active[
+                    ~(np.abs(lam[active] - previous) < self.tolerance)
+                ]
+                if not active.size:
+                    break
+
+            (
+                sin_sigma, cos_sigma, sigma, sin_alpha,
+                cos2_alpha, cos_2sigma_m,
+            ) = self._auxiliary(lam, sin_u1, cos_u1, sin_u2, cos_u2)
+            u_sq = cos2_alpha * (WGS84_A_KM ** 2 - WGS84_B_KM ** 2)
+            u_sq /= WGS84_B_KM ** 2
+            a = 1 + u_sq / 16384 * (
+                4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq))
+            )
+            b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+            delta_sigma = b * sin_sigma * (
+                cos_2sigma_m
+                + b / 4 * (
+                    cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+                    - b / 6 * cos_2sigma_m
+                    * (-3 + 4 * sin_sigma ** 2)
+                    * (-3 + 4 * cos_2sigma_m ** 2)
+                )
+            )
+            distance_km = WGS84_B_KM * a * (sigma - delta_sigma)
+
+        if active.size:
+            spherical = HaversineEngine().distances_km(
+                lat1[active], lon1[active], lat2[active], lon2[active]
+            )
+            distance_km[active] = (
+                spherical * WGS84_MEAN_RADIUS_KM / EARTH_RADIUS_KM
+            )
+        return distance_km
+
+    @staticmethod
+    def _auxiliary(lam, sin_u1, cos_u1, sin_u2, cos_u2):
+        """
+        Returns the auxiliary sphere terms of Vincenty's formula
+        for the given longitude difference ``lam``.
+        """
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(
+            cos_u2 * sin_lam,
+            cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam,
+        )
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        sin_alpha = np.where(
+            sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma
+        )
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sigma_m = np.where(
+            cos2_alpha == 0,
+            0.0,
+            cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha,
+        )
+        return (
+            sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m
+        )
+
+    @classmethod
+    def _next_lambda(cls, lam, longitude, sin_u1, cos_u1, sin_u2, cos_u2):
+        """Returns the next iterate of the longitude difference."""
+        (
+            sin_sigma, cos_sigma, sigma, sin_alpha,
+            cos2_alpha, cos_2sigma_m,
+        ) = cls._auxiliary(lam, sin_u1, cos_u1, sin_u2, cos_u2)
+        f = WGS84_F
+        c = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        return longitude + (1 - c) * f * sin_alpha * (
+            sigma
+            + c * sin_sigma * (
+                cos_2sigma_m
+                + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            )
+        )
+
+
+DISTANCE_ENGINES = {
+    engine.name: engine
+    for engine in (HaversineEngine(), UnitVectorEngine(), VincentyEngine())
+}
+
+
+def get_distance_engine(
+    engine: DistanceEngine | str | None = None,
+) -> DistanceEngine:
+    """
+    Returns a distance engine from an instance, a name from
+    ``DISTANCE_ENGINES`` or ``None`` for the default Haversine engine.
+
+    Engines looked up by name are shared, so every flight and batch
+    using e.g. "unit_vector" shares one airport vector cache.
+    """
+    if engine is None:
+        return DISTANCE_ENGINES[HaversineEngine.name]
+    if isinstance(engine, DistanceEngine):
+        return engine
+    if engine in DISTANCE_ENGINES:
+        return DISTANCE_ENGINES[engine]
+    raise ValueError(f"Unknown distance engine: {engine}")
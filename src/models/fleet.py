@@ -0,0 +1,192 @@
+import os
+from typing import Any, Sequence
+
+import numpy as np
+
+from src.aircraft_data.manufacturers.manufacturers import manufacturers
+from src.models.aircraft import Aircraft
+from src.models.distance import DistanceEngine, get_distance_engine
+from src.models.flight_batch import FlightBatch
+
+AIRCRAFT_DATA_DIR = "src/aircraft_data/json_data"
+RANKINGS = ("block_fuel", "spare_payload")
+_NO_LIMIT = np.iinfo(np.int64).max
+
+
+def available_aircraft() -> list[str]:
+    """
+    Returns the ICAO codes of every aircraft type
+    that has a data file in the aircraft data directory.
+    """
+    aircraft_types = []
+    for manufacturer in manufacturers.values():
+        path = os.path.join(AIRCRAFT_DATA_DIR, manufacturer)
+        if not os.path.isdir(path):
+            continue
+        for model in os.listdir(path):
+            if os.path.exists(os.path.join(path, model, "__init__.json")):
+                aircraft_types.append(model)
+    return sorted(aircraft_types)
+
+
+def spare_payload(batch: FlightBatch, max_payload=None) -> np.ndarray:
+    """
+    Returns the extra payload every flight of the batch could carry
+    before reaching its ZFW, TOW or LW limit or, when ``max_payload``
+    gives the maximum payload of each type in ``batch.aircraft_types``,
+    the aircraft's maximum payload.
+    """
+    limits = [
+        batch.max_zfw - batch.estimated_zfw,
+        batch.max_tow - batch.estimated_tow,
+        batch.max_lw - batch.estimated_lw,
+    ]
+    if max_payload is not None:
+        limits.append(
+            np.asarray(max_payload)[batch.aircraft_index] - batch.payload
+        )
+    return np.minimum.reduce(limits)
+
+
+def assign_fleet(
+    dep_lat,
+    dep_lon,
+    arr_lat,
+    arr_lon,
+    aircraft_types: Sequence[str] | None = None,
+    rank_by: str = "block_fuel",
+    chunk_size: int = 4096,
+    distance_engine: DistanceEngine | str | None = None,
+) -> list[list[dict[str, Any]]]:
+    """
+    Finds the aircraft types that can fly each route and ranks them.
+
+    Every route is evaluated against every aircraft type with
+    ``FlightBatch``. A type can fly a route when the flight breaks
+    none of its weight limits and the distance is within the
+    type's range. Feasible types are ranked by the least block fuel
+    or by the most spare payload. Routes are processed in chunks
+    of ``chunk_size`` so memory stays flat for long route lists.
+
+    Args:
+        dep_lat, dep_lon (array-like): Departure coordinates in degrees.
+        arr_lat, arr_lon (array-like): Arrival coordinates in degrees.
+        aircraft_types (Sequence[str], optional): Types to consider,
+            all available types by default.
+        rank_by (str): Either "block_fuel" or "spare_payload".
+        chunk_size (int): Number of routes evaluated at once.
+        distance_engine (DistanceEngine | str, optional): Engine used
+            to measure route distances, Haversine by default.
+
+    Returns:
+        list[list[dict]]: For every route, the feasible aircraft
+            types from best to worst.
+    """
+    if rank_by not in RANKINGS:
+        raise ValueError(f"rank_by must be one of: {', '.join(RANKINGS)}.")
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive.")
+
+    if aircraft_types is None:
+        aircraft_types = available_aircraft()
+    aircraft_types = list(aircraft_types)
+    if not aircraft_types:
+        raise ValueError("No aircraft types to assign.")
+
+    profiles = {
+        icao: Aircraft(icao).data[icao] for icao in aircraft_types
+    }
+    max_range = np.array(
+        [
+            profiles[icao].get("rangeflight", {}).get("MAX", np.inf)
+            for icao in aircraft_types
+        ],
+        dtype=np.float64,
+    )
+    max_payload = np.array(
+        [
+            profiles[icao].get("Payload", {}).get("MAX", _NO_LIMIT)
+            for icao in aircraft_types
+        ],
+        dtype=np.int64,
+    )
+
+    distance_engine = get_distance_engine(distance_engine)
+    coordinates = [
+        np.asarray(values, dtype=np.float64)
+        for values in (dep_lat, dep_lon, arr_lat, arr_lon)
+    ]
+    routes_count = coordinates[0].shape[0]
+    assignments = []
+    for start in range(0, routes_count, chunk_size):
+        chunk = [values[start:start + chunk_size] for values in coordinates]
+        assignments.extend(
+            _assign_chunk(
+                chunk, aircraft_types, profiles,
+                max_range, max_payload, rank_by, distance_engine,
+            )
+        )
+    return assignments
+
+
+def _assign_chunk(
+    coordinates: list[np.ndarray],
+    aircraft_types: list[str],
+    profiles: dict[str, dict],
+    max_range: np.ndarray,
+    max_payload: np.ndarray,
+    rank_by: str,
+    distance_engine: DistanceEngine,
+) -> list[list[dict[str, Any]]]:
+    """
+    Evaluates one chunk of routes against every aircraft type
+    and returns the ranked feasible types of each route.
+
+    Distance does not depend on the aircraft type, so every route
+    is measured once and its distance is shared by all types.
+    """
+    types_count = len(aircraft_types)
+    routes_count = coordinates[0].shape[0]
+    shape = (routes_count, types_count)
+
+    with np.errstate(invalid="ignore"):
+        route_km = distance_engine.distances_km(*coordinates)
+    batch = FlightBatch(
+        *(np.repeat(values, types_count) for values in coordinates),
+        aircraft_types,
+        np.tile(np.arange(types_count), routes_count),
+        profiles=profiles,
+        distance_engine=distance_engine,
+        distance_km=np.repeat(route_km, types_count),
+    )
+    block_fuel = batch.block_fuel.reshape(shape)
+    spare = spare_payload(batch, max_payload).reshape(shape)
+    feasible = (
+        batch.valid.reshape(shape)
+        & (batch.distance_km.reshape(shape) <= max_range)
+    )
+
+    if rank_by == "block_fuel":
+        order = np.argsort(block_fuel, axis=1, kind="stable")
+    else:
+        order = np.argsort(-spare, axis=1, kind="stable")
+    ranked_feasible = np.take_along_axis(feasible, order, axis=1)
+
+    block_fuel = np.trunc(block_fuel).astype(np.int64).tolist()
+    spare = spare.tolist()
+    assignments = []
+    for route, (types_order, types_feasible) in enumerate(
+        zip(order.tolist(), ranked_feasible.tolist())
+    ):
+        assignments.append(
+            [
+                {
+                    "aircraft": aircraft_types[aircraft],
+                    "block_fuel_kg": block_fuel[route][aircraft],
+                    "spare_payload_kg": spare[route][aircraft],
+                }
+                for aircraft, is_feasible in zip(types_order, types_feasible)
+                if is_feasible
+            ]
+        )
+    return assignments
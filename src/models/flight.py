@@ -1,7 +1,9 @@
-from math import radians, sin, cos, sqrt, atan2
 from models.api_client import CheckWXClient
 from src.models.airport import Airport
+from src.models.airport_index import AirportIndex
 from src.models.aircraft import Aircraft
+from src.models.distance import DistanceEngine, get_distance_engine
+from src.models.report import TEMPLATES, flight_record
 import json
 from typing import Any
 
@@ -22,11 +24,26 @@ class Flight:
         arr_icao (str): ICAO code of the arrival airport.
         aircraft_icao (str): ICAO code of the
             aircraft being used for the flight.
+        distance_engine (DistanceEngine | str, optional): Engine used
+            to measure the distance, Haversine by default.
+        airport_index (AirportIndex, optional): Index used to resolve
+            and validate airport identifiers before calling the API.
     """
 
-    def __init__(self, dep_icao: str, arr_icao: str, aircraft_icao: str):
+    def __init__(
+        self,
+        dep_icao: str,
+        arr_icao: str,
+        aircraft_icao: str,
+        distance_engine: DistanceEngine | str | None = None,
+        airport_index: AirportIndex | None = None,
+    ):
+        self.distance_engine = get_distance_engine(distance_engine)
         self.aircraft = Aircraft(aircraft_icao)
         self.aircraft_data = self.aircraft.data[self.aircraft.aircraft_icao]
+        if airport_index is not None:
+            dep_icao = airport_index.resolve(dep_icao)
+            arr_icao = airport_index.resolve(arr_icao)
         self.dep_airport = Airport(dep_icao, api_client=client)
         self.arr_airport = Airport(arr_icao, api_client=client)
         self.distance_km: float = 0.0
@@ -103,23 +120,8 @@ class Flight:
 
     def print_flight_params(self) -> None:
         """Prints the flight parameters."""
-        print(
-            f"\nAircraft: {self.aircraft.aircraft_icao}",
-            f"\n{self.dep_airport.icao_code}"
-            + f" lat:{self.dep_airport.latitude},"
-            + f" lon:{self.dep_airport.longitude}",
-            f"\n{self.arr_airport.icao_code}"
-            + f" lat:{self.arr_airport.latitude},"
-            + f" lon:{self.arr_airport.longitude}",
-            f"\nDistance: {self.distance_km:.0f} km\n",
-            f"\nPassengers [max]: {self.passengers_count}",
-            f"\nBlock Fuel: {self.block_fuel:.0f} kg",
-            f"\nPayload: {self.payload} kg",
-            f"\nCargo: {self.cargo:.0f} kg\n",
-            f"\nZFW est:{self.estimated_zfw}, max:{self.max_zfw}",
-            f"\nTOW est:{self.estimated_tow}, max:{self.max_tow}",
-            f"\nLW est:{self.estimated_lw}, max:{self.max_lw}\n",
-        )
+        text = TEMPLATES["text"].format_flight(flight_record(self))
+        print(text, end="")
 
     def _haversine_distance(
         self, lat1: float, lon1: float, lat2: float, lon2: float
@@ -128,26 +130,7 @@ class Flight:
         Calculates the distance between
         two points using the Haversine formula.
         """
-        if not (-90 <= lat1 <= 90 and -90 <= lat2 <= 90):
-            raise ValueError(
-                "Latitude must be between -90 and 90 degrees."
-            )
-        if not (-180 <= lon1 <= 180 and -180 <= lon2 <= 180):
-            raise ValueError(
-                "Longitude must be between -180 and 180 degrees."
-            )
-
-        R = 6371.0
-        (lat1_rad, lon1_rad, lat2_rad, lon2_rad) = map(
-            radians, [lat1, lon1, lat2, lon2]
-        )
-        dlat, dlon = lat2_rad - lat1_rad, lon2_rad - lon1_rad
-        a = (
-            sin(dlat / 2) ** 2
-            + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2) ** 2
-        )
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        return R * c
+        return get_distance_engine().distance_km(lat1, lon1, lat2, lon2)
 
     def _distance_100km(self) -> float:
         """
@@ -182,7 +165,7 @@ class Flight:
         Calculates the distance between two airports.
         """
         try:
-            distance_km = self._haversine_distance(
+            distance_km = self.distance_engine.distance_km(
                 self.dep_airport.latitude,
                 self.dep_airport.longitude,
                 self.arr_airport.latitude,
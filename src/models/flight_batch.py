@@ -0,0 +1,428 @@
+from enum import IntFlag
+from typing import Any, Sequence
+
+import numpy as np
+
+from src.models.aircraft import Aircraft
+from src.models.distance import DistanceEngine, get_distance_engine
+
+PASSENGER_WEIGHT_KG = 104
+CARGO_PER_PASSENGER = 3.5
+BASE_FUEL_COEFFICIENT = 1.5
+ADDITIONAL_FUEL_COEFFICIENT = 0.3
+ROUNDING_TOLERANCE = 1e-6
+
+
+class Violation(IntFlag):
+    """
+    Reason codes for flights that break an aircraft limit.
+
+    Codes are bit flags, so a single flight can carry several of them.
+    """
+
+    NONE = 0
+    ZFW = 1
+    TOW = 2
+    LW = 4
+    COORDINATES = 8
+
+
+class FlightBatch:
+    """
+    Represents many flights calculated at once as NumPy columns.
+
+    The batch runs the same chain of formulas as ``Flight``
+    (distance, block fuel, payload, cargo, ZFW, TOW and LW),
+    but for whole arrays of routes in a single pass. Instead of
+    raising ``ValueError`` when a limit is exceeded, every flight
+    gets a ``Violation`` code and the per-limit boolean masks
+    are exposed as ``zfw_exceeded``, ``tow_exceeded``, ``lw_exceeded``
+    and ``invalid_coordinates``.
+
+    Args:
+        dep_lat, dep_lon (array-like): Departure coordinates in degrees.
+        arr_lat, arr_lon (array-like): Arrival coordinates in degrees.
+        aircraft_icao (str | Sequence[str]): A single aircraft ICAO code
+            for every flight, one code per flight, or, together with
+            ``aircraft_index``, the list of aircraft types in the batch.
+        aircraft_index (array-like, optional): Position of each flight's
+            aircraft in ``aircraft_icao``.
+        dep_icao, arr_icao (Sequence[str], optional): Airport codes,
+            only used for output.
+        profiles (dict, optional): Aircraft data keyed by ICAO code.
+            Types missing from it are loaded with ``Aircraft``.
+        distance_engine (DistanceEngine | str, optional): Engine used
+            to measure distances, Haversine by default.
+        route_airports (tuple, optional): ``(lat, lon, dep_index,
+            arr_index)`` with one coordinate per airport and the
+            airport positions of every flight, as built by
+            ``from_airports``. Distances are then measured with the
+            engine's ``route_distances_km``.
+        distance_km (array-like, optional): Distances already measured
+            with ``distance_engine``, one per flight, e.g. for one
+            route flown by several aircraft types. They are used
+            instead of measuring the routes again.
+    """
+
+    def __init__(
+        self,
+        dep_lat,
+        dep_lon,
+        arr_lat,
+        arr_lon,
+        aircraft_icao: str | Sequence[str],
+        aircraft_index=None,
+        dep_icao: Sequence[str] | None = None,
+        arr_icao: Sequence[str] | None = None,
+        profiles: dict[str, dict] | None = None,
+        distance_engine: DistanceEngine | str | None = None,
+        route_airports: tuple | None = None,
+        distance_km=None,
+    ):
+        self.dep_lat = np.asarray(dep_lat, dtype=np.float64)
+        self.dep_lon = np.asarray(dep_lon, dtype=np.float64)
+        self.arr_lat = np.asarray(arr_lat, dtype=np.float64)
+        self.arr_lon = np.asarray(arr_lon, dtype=np.float64)
+        self.size = self.dep_lat.shape[0]
+        if not (
+            self.dep_lon.shape
+            == self.arr_lat.shape
+            == self.arr_lon.shape
+            == (self.size,)
+        ):
+            raise ValueError("Coordinate arrays must have the same length.")
+
+        self.aircraft_types, self.aircraft_index = self._encode_aircraft(
+            aircraft_icao, aircraft_index
+        )
+        self.dep_icao = dep_icao
+        self.arr_icao = arr_icao
+        self.distance_engine = get_distance_engine(distance_engine)
+        self.route_airports = route_airports
+        self.measured_distance_km = None
+        if distance_km is not None:
+            self.measured_distance_km = np.asarray(
+                distance_km, dtype=np.float64
+            )
+            if self.measured_distance_km.shape != (self.size,):
+                raise ValueError(
+                    "Distances must have one entry per flight."
+                )
+        self._load_profiles(profiles or {})
+        self.calculate_flight_params()
+
+    @classmethod
+    def from_airports(
+        cls,
+        lat,
+        lon,
+        dep_index,
+        arr_index,
+        aircraft_icao: str | Sequence[str],
+        aircraft_index=None,
+        airport_icao: Sequence[str] | None = None,
+        **kwargs,
+    ) -> "FlightBatch":
+        """
+        Creates a batch from per-airport coordinates and the
+        airport positions of every flight, so engines that cache
+        per-airport data (like "unit_vector") compute it once per
+        airport instead of once per flight.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        dep_index = np.asarray(dep_index, dtype=np.intp)
+        arr_index = np.asarray(arr_index, dtype=np.intp)
+        dep_icao = arr_icao = None
+        if airport_icao is not None:
+            dep_icao = [airport_icao[i] for i in dep_index.tolist()]
+            arr_icao = [airport_icao[i] for i in arr_index.tolist()]
+        return cls(
+            lat[dep_index],
+            lon[dep_index],
+            lat[arr_index],
+            lon[arr_index],
+            aircraft_icao,
+            aircraft_index,
+            dep_icao=dep_icao,
+            arr_icao=arr_icao,
+            route_airports=(lat, lon, dep_index, arr_index),
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _encode_aircraft(self, aircraft_icao, aircraft_index):
+        """
+        Returns the list of aircraft types and
+        the type index of every flight.
+        """
+        if isinstance(aircraft_icao, str):
+            if aircraft_index is not None:
+                raise ValueError(
+                    "aircraft_index requires a list of aircraft types."
+                )
+            return [aircraft_icao], np.zeros(self.size, dtype=np.intp)
+
+        if aircraft_index is None:
+            types, index = np.unique(
+                np.asarray(aircraft_icao, dtype=str), return_inverse=True
+            )
+            types = types.tolist()
+        else:
+            types = list(aircraft_icao)
+            index = np.asarray(aircraft_index, dtype=np.intp)
+
+        if index.shape != (self.size,):
+            raise ValueError(
+                "Aircraft data must have one entry per flight."
+            )
+        if self.size and (index.min() < 0 or index.max() >= len(types)):
+            raise ValueError("Aircraft index is out of range.")
+        return types, index
+
+    def _load_profiles(self, profiles: dict[str, dict]) -> None:
+        """
+        Loads the aircraft data of every type in
+        the batch into per-type integer columns.
+        """
+        rows = []
+        for icao in self.aircraft_types:
+            data = profiles.get(icao)
+            if data is None:
+                data = Aircraft(icao).data[icao]
+            rows.append(self._profile_row(data))
+
+        columns = np.array(rows, dtype=np.int64).reshape(-1, 6).T
+        (
+            self.type_fuel_on_100km,
+            self.type_passengers,
+            self.type_empty_weight,
+            self.type_max_zfw,
+            self.type_max_tow,
+            self.type_max_lw,
+        ) = columns
+
+    @staticmethod
+    def _profile_value(
+        data: dict[str, Any], key: str, field: str, name: str
+    ) -> Any:
+        """
+        Returns one aircraft data value or raises
+        the same error ``Flight`` raises when it is missing.
+        """
+        try:
+            return data[key][field]
+        except KeyError:
+            raise ValueError(f"{name} data for aircraft is missing.")
+
+    @classmethod
+    def _profile_row(cls, data: dict[str, Any]) -> tuple[int, ...]:
+        """
+        Validates aircraft data the same way ``Flight`` does
+        and returns its limits as a tuple of integers.
+        """
+        fuel_on_100km = int(
+            cls._profile_value(data, "FuelOn100km", "MAX", "Fuel")
+        )
+        passengers = cls._profile_value(data, "Passengers", "MAX", "Passenger")
+        if not isinstance(passengers, int) or passengers < 0:
+            raise ValueError("Invalid passenger count data.")
+
+        limits = [
+            cls._profile_value(data, key, field, name)
+            for key, field, name in (
+                ("ZWF", "EMP", "ZFW"),
+                ("ZWF", "MAX", "ZFW"),
+                ("TOW", "MAX", "TOW"),
+                ("LW", "MAX", "LW"),
+            )
+        ]
+        if any(not isinstance(value, int) or value < 0 for value in limits):
+            raise ValueError("Invalid count data.")
+
+        return (fuel_on_100km, passengers, *limits)
+
+    def calculate_flight_params(self) -> None:
+        """Calculates the flight parameters for every flight."""
+        index = self.aircraft_index
+        self.passengers_count = self.type_passengers[index]
+        self.empty_weight = self.type_empty_weight[index]
+        self.max_zfw = self.type_max_zfw[index]
+        self.max_tow = self.type_max_tow[index]
+        self.max_lw = self.type_max_lw[index]
+        self.fuel_on_100km = self.type_fuel_on_100km[index]
+
+        self.distance_km = self.calculate_distance_km()
+        self._calculate_weights()
+
+        rows = self._rounding_sensitive_rows()
+        if rows.size:
+            self.distance_km[rows] = [
+                self.distance_engine.distance_km(
+                    self.dep_lat[i],
+                    self.dep_lon[i],
+                    self.arr_lat[i],
+                    self.arr_lon[i],
+                )
+                for i in rows
+            ]
+            self._calculate_weights()
+
+        self.zfw_exceeded = self.estimated_zfw > self.max_zfw
+        self.tow_exceeded = self.estimated_tow > self.max_tow
+        self.lw_exceeded = self.estimated_lw > self.max_lw
+
+        violations = np.zeros(self.size, dtype=np.uint8)
+        for mask, code in (
+            (self.zfw_exceeded, Violation.ZFW),
+            (self.tow_exceeded, Violation.TOW),
+            (self.lw_exceeded, Violation.LW),
+            (self.invalid_coordinates, Violation.COORDINATES),
+        ):
+            violations[mask] |= np.uint8(code)
+        self.violations = violations
+        self.valid = violations == Violation.NONE
+
+    def _calculate_weights(self) -> None:
+        """Calculates every parameter that follows from the distance."""
+        self.block_fuel = self.calculate_block_fuel()
+        self.payload = self.calculate_payload()
+        self.cargo = self.calculate_cargo()
+        self.estimated_zfw = self.payload + self.empty_weight
+        self.estimated_tow = self.calculate_tow()
+        self.estimated_lw = self.calculate_lw()
+
+    def _rounding_sensitive_rows(self) -> np.ndarray:
+        """
+        Returns the flights whose integer results sit so close to
+        a whole number that the last-bit difference between NumPy
+        and scalar trigonometry could change them.
+        """
+        raw_values = (
+            self.distance_km,
+            self.distance_km / 100,
+            self.block_fuel,
+            self.empty_weight + self.block_fuel + self.payload,
+            self.estimated_tow - self.block_fuel + self.cargo,
+        )
+        near = np.zeros(self.size, dtype=bool)
+        for values in raw_values:
+            near |= np.abs(values - np.rint(values)) < ROUNDING_TOLERANCE
+        return np.flatnonzero(near & ~self.invalid_coordinates)
+
+    def calculate_distance_km(self) -> np.ndarray:
+        """
+        Calculates the distance of every flight
+        with the batch's distance engine.
+
+        Flights with coordinates out of range, or whose distance
+        is not a finite number, are flagged in ``invalid_coordinates``
+        and get a distance of zero.
+        """
+        self.invalid_coordinates = ~(
+            (np.abs(self.dep_lat) <= 90)
+            & (np.abs(self.arr_lat) <= 90)
+            & (np.abs(self.dep_lon) <= 180)
+            & (np.abs(self.arr_lon) <= 180)
+        )
+
+        with np.errstate(invalid="ignore"):
+            distance_km = self._measure_distances()
+        self.invalid_coordinates |= ~np.isfinite(distance_km)
+        distance_km[self.invalid_coordinates] = 0.0
+        return distance_km
+
+    def _measure_distances(self) -> np.ndarray:
+        """
+        Returns the raw distance of every flight, measured with
+        the distance engine unless it was given to the batch.
+        """
+        if self.measured_distance_km is not None:
+            return self.measured_distance_km.copy()
+        if self.route_airports is not None:
+            return self.distance_engine.route_distances_km(
+                *self.route_airports
+            )
+        return self.distance_engine.distances_km(
+            self.dep_lat, self.dep_lon, self.arr_lat, self.arr_lon
+        )
+
+    def calculate_block_fuel(self) -> np.ndarray:
+        """
+        Calculates the block fuel required for every flight.
+        """
+        total_coefficient = (
+            BASE_FUEL_COEFFICIENT
+            + (self.distance_km // 100) * ADDITIONAL_FUEL_COEFFICIENT
+        )
+        distance_100km = self.distance_km / 100 / total_coefficient
+        return self.fuel_on_100km * distance_100km
+
+    def calculate_payload(self) -> np.ndarray:
+        """
+        Calculates the payload of every flight
+        based on the number of passengers.
+        """
+        return self.passengers_count * PASSENGER_WEIGHT_KG
+
+    def calculate_cargo(self) -> np.ndarray:
+        """
+        Calculates the cargo weight of every flight
+        based on the number of passengers.
+        """
+        return self.payload * CARGO_PER_PASSENGER / 14
+
+    def calculate_tow(self) -> np.ndarray:
+        """
+        Calculates the estimated Takeoff Weight (TOW) of every flight.
+        """
+        estimated_tow = self.empty_weight + self.block_fuel + self.payload
+        return np.trunc(estimated_tow).astype(np.int64)
+
+    def calculate_lw(self) -> np.ndarray:
+        """
+        Calculates the estimated Landing Weight (LW) of every flight.
+        """
+        estimated_lw = self.estimated_tow - self.block_fuel + self.cargo
+        return np.trunc(estimated_lw).astype(np.int64)
+
+    def _to_dict(self, index: int) -> dict[str, Any]:
+        """
+        Returns the calculations of one flight as a dictionary
+        in the same layout as ``Flight._to_dict``.
+        """
+        return {
+            "aircraft": self.aircraft_types[self.aircraft_index[index]],
+            "departure": {
+                "icao": self.dep_icao[index] if self.dep_icao else None,
+                "latitude": float(self.dep_lat[index]),
+                "longitude": float(self.dep_lon[index]),
+            },
+            "arrival": {
+                "icao": self.arr_icao[index] if self.arr_icao else None,
+                "latitude": float(self.arr_lat[index]),
+                "longitude": float(self.arr_lon[index]),
+            },
+            "parameters": {
+                "distance_km": int(self.distance_km[index]),
+                "passengers_max": int(self.passengers_count[index]),
+                "block_fuel_kg": int(self.block_fuel[index]),
+                "payload_kg": int(self.payload[index]),
+                "cargo_kg": int(self.cargo[index]),
+                "zfw": {
+                    "est": int(self.estimated_zfw[index]),
+                    "max": int(self.max_zfw[index])
+                },
+                "tow": {
+                    "est": int(self.estimated_tow[index]),
+                    "max": int(self.max_tow[index])
+                },
+                "lw": {
+                    "est": int(self.estimated_lw[index]),
+                    "max": int(self.max_lw[index])
+                },
+            },
+            "violations": int(self.violations[index]),
+        }
@@ -0,0 +1,374 @@
+from html import escape
+from itertools import groupby
+from operator import itemgetter
+from string import Formatter
+from typing import Any, Callable, Iterable, Iterator, Mapping, TextIO
+
+import numpy as np
+
+BUFFER_SIZE = 1000
+GROUP_KEYS = {"departure": "dep_icao", "arrival": "arr_icao"}
+TOTAL_FIELDS = ("distance_km", "block_fuel", "payload", "cargo")
+ESCAPED_FIELDS = ("aircraft", "dep_icao", "arr_icao")
+
+
+def compile_format(template: str) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Parses a format string with named fields once and returns a
+    function that formats a record with it, like ``str.format_map``.
+
+    The fields are replaced by positional ones and read with a single
+    ``itemgetter``, which is noticeably faster than ``format_map``
+    when the same template is used for many records.
+    """
+    parts = list(Formatter().parse(template))
+    fields = [field for _, field, _, _ in parts if field is not None]
+    if not fields or not all(field.isidentifier() for field in fields):
+        return template.format_map
+
+    positional = []
+    for literal, field, format_spec, conversion in parts:
+        positional.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is not None:
+            positional.append(
+                "{"
+                + (f"!{conversion}" if conversion else "")
+                + (f":{format_spec}" if format_spec else "")
+                + "}"
+            )
+    format_values = "".join(positional).format
+    if len(fields) == 1:
+        field = fields[0]
+        return lambda record: format_values(record[field])
+    get_values = itemgetter(*fields)
+    return lambda record: format_values(*get_values(record))
+
+
+class ReportTemplate:
+    """
+    Set of format strings that make up one report format.
+
+    Every part is formatted like ``str.format_map``: ``flight`` with
+    a flight record, ``group_header`` with the group name and
+    ``summary`` with the totals of a group or of the whole report.
+    ``flight`` and ``summary`` are parsed once into
+    ``format_flight`` and ``format_summary``.
+    """
+
+    def __init__(
+        self,
+        flight: str,
+        summary: str,
+        header: str = "",
+        footer: str = "",
+        group_header: str = "{group}\n",
+        table_header: str = "",
+        table_footer: str = "",
+        escape_html: bool = False,
+    ) -> None:
+        self.flight = flight
+        self.summary = summary
+        self.format_flight = compile_format(flight)
+        self.format_summary = compile_format(summary)
+        self.header = header
+        self.footer = footer
+        self.group_header = group_header
+        self.table_header = table_header
+        self.table_footer = table_footer
+        self.escape_html = escape_html
+
+
+TEMPLATES = {
+    "text": ReportTemplate(
+        flight=(
+            "\nAircraft: {aircraft} "
+            "\n{dep_icao} lat:{dep_lat}, lon:{dep_lon} "
+            "\n{arr_icao} lat:{arr_lat}, lon:{arr_lon} "
+            "\nDistance: {distance_km:.0f} km\n "
+            "\nPassengers [max]: {passengers} "
+            "\nBlock Fuel: {block_fuel:.0f} kg "
+            "\nPayload: {payload} kg "
+            "\nCargo: {cargo:.0f} kg\n "
+            "\nZFW est:{zfw_est}, max:{zfw_max} "
+            "\nTOW est:{tow_est}, max:{tow_max} "
+            "\nLW est:{lw_est}, max:{lw_max}\n\n"
+        ),
+        summary=(
+            "\nFlights: {flights} "
+            "\nDistance: {distance_km:.0f} km "
+            "\nBlock Fuel: {block_fuel:.0f} kg "
+            "\nPayload: {payload} kg "
+            "\nCargo: {cargo:.0f} kg\n"
+        ),
+        group_header="\n== {group} ==\n",
+    ),
+    "markdown": ReportTemplate(
+        flight=(
+            "| {aircraft} | {dep_icao} | {arr_icao} | {distance_km:.0f} "
+            "| {passengers} | {block_fuel:.0f} | {payload} | {cargo:.0f} "
+            "| {zfw_est}/{zfw_max} | {tow_est}/{tow_max} "
+            "| {lw_est}/{lw_max} |\n"
+        ),
+        summary=(
+            "\n**Flights:** {flights}, "
+            "**Distance:** {distance_km:.0f} km, "
+            "**Block fuel:** {block_fuel:.0f} kg, "
+            "**Payload:** {payload} kg, "
+            "**Cargo:** {cargo:.0f} kg\n"
+        ),
+        header="# Flight briefing\n",
+        group_header="\n## {group}\n",
+        table_header=(
+            "\n| Aircraft | From | To | Distance, km | Passengers "
+            "| Block fuel, kg | Payload, kg | Cargo, kg "
+            "| ZFW est/max | TOW est/max | LW est/max |"
+            "\n|---|---|---|---:|---:|---:|---:|---:|---:|---:|---:|\n"
+        ),
+    ),
+    "html": ReportTemplate(
+        flight=(
+            "<tr><td>{aircraft}</td><td>{dep_icao}</td><td>{arr_icao}</td>"
+            "<td>{distance_km:.0f}</td><td>{passengers}</td>"
+            "<td>{block_fuel:.0f}</td><td>{payload}</td>"
+            "<td>{cargo:.0f}</td><td>{zfw_est}/{zfw_max}</td>"
+            "<td>{tow_est}/{tow_max}</td><td>{lw_est}/{lw_max}</td></tr>\n"
+        ),
+        summary=(
+            "<p>Flights: {flights}, "
+            "Distance: {distance_km:.0f} km, "
+            "Block fuel: {block_fuel:.0f} kg, "
+            "Payload: {payload} kg, "
+            "Cargo: {cargo:.0f} kg</p>\n"
+        ),
+        header=(
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            "<title>Flight briefing</title>\n</head>\n<body>\n"
+            "<h1>Flight briefing</h1>\n"
+        ),
+        footer="</body>\n</html>\n",
+        group_header="<h2>{group}</h2>\n",
+        table_header=(
+            "<table>\n<tr><th>Aircraft</th><th>From</th><th>To</th>"
+            "<th>Distance, km</th><th>Passengers</th>"
+            "<th>Block fuel, kg</th><th>Payload, kg</th>"
+            "<th>Cargo, kg</th><th>ZFW est/max</th>"
+            "<th>TOW est/max</th><th>LW est/max</th></tr>\n"
+        ),
+        table_footer="</table>\n",
+        escape_html=True,
+    ),
+}
+
+
+def flight_record(flight) -> dict[str, Any]:
+    """
+    Returns the parameters of a ``Flight`` as a flat report record.
+    """
+    return {
+        "aircraft": flight.aircraft.aircraft_icao,
+        "dep_icao": flight.dep_airport.icao_code,
+        "dep_lat": flight.dep_airport.latitude,
+        "dep_lon": flight.dep_airport.longitude,
+        "arr_icao": flight.arr_airport.icao_code,
+        "arr_lat": flight.arr_airport.latitude,
+        "arr_lon": flight.arr_airport.longitude,
+        "distance_km": flight.distance_km,
+        "passengers": flight.passengers_count,
+        "block_fuel": flight.block_fuel,
+        "payload": flight.payload,
+        "cargo": flight.cargo,
+        "zfw_est": flight.estimated_zfw,
+        "zfw_max": flight.max_zfw,
+        "tow_est": flight.estimated_tow,
+        "tow_max": flight.max_tow,
+        "lw_est": flight.estimated_lw,
+        "lw_max": flight.max_lw,
+    }
+
+
+def batch_records(batch, order=None) -> Iterator[dict[str, Any]]:
+    """
+    Yields the flights of a ``FlightBatch`` as flat report records,
+    optionally in the order given by an array of flight indexes.
+    """
+    columns = {
+        "dep_lat": batch.dep_lat,
+        "dep_lon": batch.dep_lon,
+        "arr_lat": batch.arr_lat,
+        "arr_lon": batch.arr_lon,
+        "distance_km": batch.distance_km,
+        "passengers": batch.passengers_count,
+        "block_fuel": batch.block_fuel,
+        "payload": batch.payload,
+        "cargo": batch.cargo,
+        "zfw_est": batch.estimated_zfw,
+        "zfw_max": batch.max_zfw,
+        "tow_est": batch.estimated_tow,
+        "tow_max": batch.max_tow,
+        "lw_est": batch.estimated_lw,
+        "lw_max": batch.max_lw,
+    }
+    names = list(columns)
+    types = batch.aircraft_types
+    size = len(batch)
+
+    for start in range(0, size, BUFFER_SIZE):
+        if order is None:
+            rows = slice(start, min(start + BUFFER_SIZE, size))
+        else:
+            rows = order[start:start + BUFFER_SIZE]
+        values = [columns[name][rows].tolist() for name in names]
+        aircraft = batch.aircraft_index[rows].tolist()
+        dep_icao = _codes(batch.dep_icao, rows, len(aircraft))
+        arr_icao = _codes(batch.arr_icao, rows, len(aircraft))
+
+        for i, row in enumerate(zip(*values)):
+            record = dict(zip(names, row))
+            record["aircraft"] = types[aircraft[i]]
+            record["dep_icao"] = dep_icao[i]
+            record["arr_icao"] = arr_icao[i]
+            yield record
+
+
+def _codes(codes, rows, count: int) -> list[str]:
+    """Returns the airport codes of one slice of flights."""
+    if codes is None:
+        return ["Unknown"] * count
+    if isinstance(rows, slice):
+        return list(codes[rows])
+    return [codes[i] for i in rows.tolist()]
+
+
+class ReportRenderer:
+    """
+    Renders many flight results into a single buffered report.
+
+    Flights are given as flat records (see ``flight_record`` and
+    ``batch_records``) and are written to the output in blocks of
+    ``BUFFER_SIZE``, so memory does not grow with the number of
+    flights. Flights can be grouped by departure or arrival airport,
+    and summary totals are added per group and for the whole report.
+
+    Args:
+        template (str | ReportTemplate): "text", "markdown", "html"
+            or a custom template.
+        group_by (str, optional): "departure" or "arrival".
+        summary (bool): Whether to write summary totals.
+    """
+
+    def __init__(
+        self,
+        template: str | ReportTemplate = "text",
+        group_by: str | None = None,
+        summary: bool = True,
+    ) -> None:
+        if isinstance(template, str):
+            if template not in TEMPLATES:
+                raise ValueError(f"Unknown report template: {template}")
+            template = TEMPLATES[template]
+        if group_by is not None and group_by not in GROUP_KEYS:
+            raise ValueError(
+                "group_by must be either 'departure' or 'arrival'."
+            )
+        self.template = template
+        self.group_by = group_by
+        self.summary = summary
+
+    def render(
+        self, records: Iterable[dict[str, Any]], output: TextIO
+    ) -> None:
+        """
+        Writes the report for the given flight records.
+
+        When grouping, records must already be ordered by
+        the grouping airport, as in ``render_batch``.
+
+        Raises:
+            ValueError: If an airport shows up again after its group
+                was written, i.e. the records are not ordered.
+        """
+        template = self.template
+        output.write(template.header)
+        if self.group_by is None:
+            totals = self._render_table(records, output)
+        else:
+            totals = self._render_groups(records, output)
+        self._write_summary(totals, output)
+        output.write(template.footer)
+
+    def render_batch(self, batch, output: TextIO) -> None:
+        """
+        Writes the report for every flight of a ``FlightBatch``.
+        """
+        order = None
+        if self.group_by is not None:
+            codes = getattr(batch, GROUP_KEYS[self.group_by])
+            if codes is not None:
+                order = np.argsort(np.asarray(codes), kind="stable")
+        self.render(batch_records(batch, order), output)
+
+    def _render_groups(
+        self, records: Iterable[dict[str, Any]], output: TextIO
+    ) -> dict[str, Any]:
+        """
+        Writes one table per grouping airport and returns the totals.
+        """
+        template = self.template
+        field = GROUP_KEYS[self.group_by]
+        totals = self._empty_totals()
+        written = set()
+        for group, group_records in groupby(records, key=itemgetter(field)):
+            if group in written:
+                raise ValueError(
+                    f"Flights are not ordered by {field}: {group} "
+                    "appears again after its group. Sort the records "
+                    "by the grouping airport first."
+                )
+            written.add(group)
+            if template.escape_html:
+                group = escape(str(group))
+            output.write(template.group_header.format(group=group))
+            group_totals = self._render_table(group_records, output)
+            self._write_summary(group_totals, output)
+            for name, value in group_totals.items():
+                totals[name] += value
+        return totals
+
+    def _render_table(
+        self, records: Iterable[dict[str, Any]], output: TextIO
+    ) -> dict[str, Any]:
+        """
+        Writes the flights of one table and returns their totals.
+        """
+        template = self.template
+        format_flight = template.format_flight
+        totals = self._empty_totals()
+        buffer = [template.table_header]
+
+        for record in records:
+            if template.escape_html:
+                record = dict(record)
+                for field in ESCAPED_FIELDS:
+                    record[field] = escape(str(record[field]))
+            buffer.append(format_flight(record))
+            totals["flights"] += 1
+            for field in TOTAL_FIELDS:
+                totals[field] += record[field]
+            if len(buffer) >= BUFFER_SIZE:
+                output.write("".join(buffer))
+                buffer.clear()
+
+        buffer.append(template.table_footer)
+        output.write("".join(buffer))
+        return totals
+
+    def _write_summary(self, totals: dict[str, Any], output: TextIO) -> None:
+        """Writes summary totals if they are enabled."""
+        if self.summary:
+            output.write(self.template.format_summary(totals))
+
+    @staticmethod
+    def _empty_totals() -> dict[str, Any]:
+        totals = dict.fromkeys(TOTAL_FIELDS, 0)
+        totals["flights"] = 0
+        return totals
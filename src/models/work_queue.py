@@ -0,0 +1,636 @@
+import argparse
+import csv
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
+
+from src.models.aircraft import Aircraft
+from src.models.distance import DistanceEngine, get_distance_engine
+from src.models.flight_batch import FlightBatch
+
+ROUTE_FIELDS = (
+    "dep_lat", "dep_lon", "arr_lat", "arr_lon",
+    "aircraft", "dep_icao", "arr_icao",
+)
+OUTPUT_FIELDS = (
+    "route_id", "aircraft", "dep_icao", "arr_icao",
+    "distance_km", "block_fuel_kg", "payload_kg", "cargo_kg",
+    "zfw_est", "tow_est", "lw_est", "violations",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS routes (
+    id INTEGER PRIMARY KEY,
+    dep_lat REAL NOT NULL,
+    dep_lon REAL NOT NULL,
+    arr_lat REAL NOT NULL,
+    arr_lon REAL NOT NULL,
+    aircraft TEXT NOT NULL,
+    dep_icao TEXT,
+    arr_icao TEXT
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    first_route INTEGER NOT NULL,
+    last_route INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    -- End of the lease, or for a pending chunk that raised an error,
+    -- the time it may be claimed again.
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS chunks_status ON chunks (status, lease_expires);
+"""
+
+
+class WorkQueue:
+    """
+    Durable queue of route chunks shared by many worker processes.
+
+    The queue lives in a single SQLite file. Workers on one machine,
+    or on several hosts sharing the file, claim chunks with a lease.
+    The file uses SQLite's rollback journal rather than WAL, which
+    needs shared memory and does not work across hosts. Every change
+    runs under an exclusive file lock, so a file shared between hosts
+    must be on a filesystem with working POSIX (fcntl) byte-range
+    locks, e.g. NFS with the lock manager running and without the
+    "nolock" mount option. Filesystems that ignore locks can corrupt
+    the queue.
+
+    A chunk whose lease expires before it is completed is handed
+    to the next worker, and completed chunks are never claimed
+    again, so a restarted run only computes what is left.
+
+    A chunk whose computation raises an error goes back to the
+    pending chunks with the error text and is claimed again after
+    ``retry_seconds``. Once a chunk has been claimed
+    ``max_attempts`` times, an error or an expired lease marks it
+    as failed, and it is not claimed again until ``retry_failed``
+    is called.
+
+    Args:
+        path (str): Path to the SQLite database file.
+        lease_seconds (float): How long a claimed chunk stays
+            reserved for its worker.
+        max_attempts (int): How many times a chunk is claimed
+            before it is given up as failed.
+        retry_seconds (float): How long a chunk that raised
+            an error waits before it is claimed again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+        retry_seconds: float = 30.0,
+    ) -> None:
+        if max_attempts <= 0:
+            raise ValueError("Max attempts must be positive.")
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.connection = sqlite3.connect(
+            path, timeout=60, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=DELETE")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def enqueue(
+        self, routes: Iterable[dict[str, Any]], chunk_size: int = 10000
+    ) -> int:
+        """
+        Stores the routes and splits them into chunks.
+
+        Every route is a dictionary with the ``ROUTE_FIELDS`` keys;
+        "dep_icao" and "arr_icao" are optional.
+
+        Returns:
+            int: The number of chunks created.
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive.")
+        with self._transaction() as cursor:
+            if cursor.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]:
+                raise ValueError("The queue already contains routes.")
+            cursor.executemany(
+                "INSERT INTO routes "
+                "(dep_lat, dep_lon, arr_lat, arr_lon, aircraft, "
+                "dep_icao, arr_icao) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    tuple(route.get(field) for field in ROUTE_FIELDS)
+                    for route in routes
+                ),
+            )
+            routes_count = cursor.execute(
+                "SELECT COUNT(*) FROM routes"
+            ).fetchone()[0]
+            cursor.executemany(
+                "INSERT INTO chunks (first_route, last_route) VALUES (?, ?)",
+                (
+                    (first, min(first + chunk_size, routes_count + 1) - 1)
+                    for first in range(1, routes_count + 1, chunk_size)
+                ),
+            )
+            return cursor.execute(
+                "SELECT COUNT(*) FROM chunks"
+            ).fetchone()[0]
+
+    def claim(self, worker: str) -> dict[str, int] | None:
+        """
+        Leases the next pending or expired chunk to a worker.
+
+        Expired chunks that already used all their attempts
+        are marked as failed instead.
+
+        Returns:
+            dict | None: The chunk "id", "first_route" and
+                "last_route", or None when nothing is left to claim.
+        """
+        now = time.time()
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET status = 'failed', lease_expires = NULL, "
+                "error = 'Lease expired after ' || attempts || ' attempts.' "
+                "WHERE status = 'leased' AND lease_expires < ? "
+                "AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = cursor.execute(
+                "SELECT id, first_route, last_route FROM chunks "
+                "WHERE status IN ('pending', 'leased') "
+                "AND (lease_expires IS NULL OR lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                "UPDATE chunks SET status = 'leased', worker = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + self.lease_seconds, row[0]),
+            )
+        return {"id": row[0], "first_route": row[1], "last_route": row[2]}
+
+    def complete(self, chunk_id: int, worker: str) -> bool:
+        """
+        Marks a chunk as done if the worker still holds its lease.
+
+        Returns:
+            bool: False if the lease was lost to another worker.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET status = 'done', lease_expires = NULL, "
+                "error = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (chunk_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def renew(self, chunk_id: int, worker: str) -> bool:
+        """
+        Extends the lease of a chunk by ``lease_seconds`` from now
+        if the worker still holds it.
+
+        Returns:
+            bool: False if the lease was lost to another worker.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET lease_expires = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, chunk_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, chunk_id: int, worker: str, error: str) -> bool:
+        """
+        Records the error of a chunk if the worker still holds its
+        lease. The chunk is claimed again after ``retry_seconds``,
+        or marked as failed if it used all its attempts.
+
+        Returns:
+            bool: False if the lease was lost to another worker.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET status = CASE WHEN attempts >= ? "
+                "THEN 'failed' ELSE 'pending' END, "
+                "lease_expires = CASE WHEN attempts >= ? "
+                "THEN NULL ELSE ? END, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (
+                    self.max_attempts,
+                    self.max_attempts,
+                    time.time() + self.retry_seconds,
+                    error,
+                    chunk_id,
+                    worker,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def retry_failed(self) -> int:
+        """
+        Returns the failed chunks to the pending ones with their
+        attempts reset, e.g. after fixing the aircraft data.
+
+        Returns:
+            int: The number of chunks queued again.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET status = 'pending', worker = NULL, "
+                "lease_expires = NULL, attempts = 0, error = NULL "
+                "WHERE status = 'failed'"
+            )
+            return cursor.rowcount
+
+    def routes(self, chunk: dict[str, int]) -> list[tuple]:
+        """Returns the routes of a chunk ordered by route id."""
+        return self.connection.execute(
+            "SELECT id, " + ", ".join(ROUTE_FIELDS) + " FROM routes "
+            "WHERE id BETWEEN ? AND ? ORDER BY id",
+            (chunk["first_route"], chunk["last_route"]),
+        ).fetchall()
+
+    def status(self) -> dict[str, int]:
+        """Returns the number of chunks in every status."""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(
+            self.connection.execute(
+                "SELECT status, COUNT(*) FROM chunks GROUP BY status"
+            ).fetchall()
+        )
+        return counts
+
+    def next_claim_time(self) -> float | None:
+        """
+        Returns the earliest time a lease expires or a chunk that
+        raised an error may be claimed again, or None if no chunk
+        is waiting for either.
+        """
+        return self.connection.execute(
+            "SELECT MIN(lease_expires) FROM chunks "
+            "WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def failures(self) -> list[dict[str, Any]]:
+        """
+        Returns the failed chunks in order with their "id",
+        "first_route", "last_route", "attempts" and "error".
+        """
+        cursor = self.connection.execute(
+            "SELECT id, first_route, last_route, attempts, error "
+            "FROM chunks WHERE status = 'failed' ORDER BY id"
+        )
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def chunk_ids(self) -> list[int]:
+        """Returns the ids of all chunks in order."""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT id FROM chunks ORDER BY id"
+            )
+        ]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Runs a block inside ``BEGIN IMMEDIATE``, so only one
+        worker at a time can change the queue.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+
+def chunk_output_path(output_dir: str, chunk_id: int) -> str:
+    """Returns the path of the partial output of a chunk."""
+    return os.path.join(output_dir, f"chunk-{chunk_id:08d}.csv")
+
+
+def process_chunk(
+    rows: list[tuple],
+    output_path: str,
+    profiles: dict[str, dict],
+    distance_engine: DistanceEngine | str | None = None,
+) -> None:
+    """
+    Calculates the flights of one chunk with ``FlightBatch`` and
+    writes them to a partial CSV output.
+
+    The output is written to a temporary file first and then
+    renamed, so a crashed worker never leaves a half-written chunk.
+    """
+    route_ids, dep_lat, dep_lon, arr_lat, arr_lon, aircraft, dep, arr = (
+        zip(*rows)
+    )
+    for icao in set(aircraft) - profiles.keys():
+        profiles[icao] = Aircraft(icao).data[icao]
+
+    batch = FlightBatch(
+        dep_lat, dep_lon, arr_lat, arr_lon, aircraft,
+        dep_icao=dep, arr_icao=arr, profiles=profiles,
+        distance_engine=distance_engine,
+    )
+    columns = (
+        route_ids,
+        [batch.aircraft_types[i] for i in batch.aircraft_index.tolist()],
+        dep,
+        arr,
+        batch.distance_km.astype(int).tolist(),
+        batch.block_fuel.astype(int).tolist(),
+        batch.payload.tolist(),
+        batch.cargo.astype(int).tolist(),
+        batch.estimated_zfw.tolist(),
+        batch.estimated_tow.tolist(),
+        batch.estimated_lw.tolist(),
+        batch.violations.tolist(),
+    )
+
+    temporary_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temporary_path, "w", newline="") as file:
+            csv.writer(file).writerows(zip(*columns))
+        os.replace(temporary_path, output_path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def run_worker(
+    queue_path: str,
+    output_dir: str,
+    worker: str | None = None,
+    lease_seconds: float = 300.0,
+    distance_engine: DistanceEngine | str | None = None,
+    max_attempts: int = 3,
+    poll_seconds: float = 1.0,
+    retry_seconds: float = 30.0,
+) -> int:
+    """
+    Claims and computes chunks until every chunk is done or failed.
+
+    While other workers still hold leases, or chunks that raised an
+    error wait for their retry, the worker waits until the earliest
+    of them can be claimed, checking again at least every
+    ``poll_seconds``, so it can take over the chunk of a crashed
+    worker. The lease of the chunk being computed is renewed in the
+    background, so chunks may take longer than ``lease_seconds``.
+
+    A chunk that raises an error, e.g. for an unknown aircraft type
+    or an unavailable output directory, is put back with the error
+    text and retried after ``retry_seconds`` until it used
+    ``max_attempts``, and the worker moves on to the next chunk.
+
+    Returns:
+        int: The number of chunks this worker completed.
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    distance_engine = get_distance_engine(distance_engine)
+    os.makedirs(output_dir, exist_ok=True)
+    queue = WorkQueue(queue_path, lease_seconds, max_attempts, retry_seconds)
+    profiles: dict[str, dict] = {}
+    completed = 0
+    try:
+        while True:
+            chunk = queue.claim(worker)
+            if chunk is None:
+                expires = queue.next_claim_time()
+                if expires is None:
+                    break
+                time.sleep(min(max(expires - time.time(), 0.0), poll_seconds))
+                continue
+            completed += _run_chunk(
+                queue, chunk, worker, output_dir, profiles, distance_engine
+            )
+    finally:
+        queue.close()
+    return completed
+
+
+def _run_chunk(
+    queue: WorkQueue,
+    chunk: dict[str, int],
+    worker: str,
+    output_dir: str,
+    profiles: dict[str, dict],
+    distance_engine: DistanceEngine,
+) -> bool:
+    """
+    Computes one claimed chunk and marks it as done or failed.
+
+    Returns:
+        bool: True if the chunk was completed by this worker.
+    """
+    try:
+        with _renewing_lease(queue, chunk["id"], worker):
+            process_chunk(
+                queue.routes(chunk),
+                chunk_output_path(output_dir, chunk["id"]),
+                profiles,
+                distance_engine,
+            )
+    except Exception as e:
+        queue.fail(chunk["id"], worker, f"{type(e).__name__}: {e}")
+        return False
+    return queue.complete(chunk["id"], worker)
+
+
+@contextmanager
+def _renewing_lease(
+    queue: WorkQueue, chunk_id: int, worker: str
+) -> Iterator[None]:
+    """
+    Renews the lease of a chunk every third of ``lease_seconds``
+    from a background thread while the block runs.
+    """
+    if queue.lease_seconds <= 0:
+        yield
+        return
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_renew_until,
+        args=(stop, queue.path, queue.lease_seconds, chunk_id, worker),
+        daemon=True,
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _renew_until(
+    stop: threading.Event,
+    queue_path: str,
+    lease_seconds: float,
+    chunk_id: int,
+    worker: str,
+) -> None:
+    """
+    Renews a lease until ``stop`` is set or the lease is lost.
+
+    Runs in its own thread with its own connection, as SQLite
+    connections can't be shared between threads.
+    """
+    queue = WorkQueue(queue_path, lease_seconds)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.renew(chunk_id, worker):
+                break
+    finally:
+        queue.close()
+
+
+def merge_outputs(queue_path: str, output_dir: str, merged_path: str) -> int:
+    """
+    Combines the partial outputs of every chunk into one CSV file.
+
+    Returns:
+        int: The number of flights written.
+
+    Raises:
+        ValueError: If some chunks are not done yet or have failed.
+    """
+    queue = WorkQueue(queue_path)
+    try:
+        status = queue.status()
+        if status["pending"] or status["leased"] or status["failed"]:
+            raise ValueError(
+                f"Not all chunks are done: {status['pending']} pending, "
+                f"{status['leased']} leased, {status['failed']} failed."
+                + "".join(
+                    "\n" + _describe_failure(failure)
+                    for failure in queue.failures()
+                )
+            )
+        chunk_ids = queue.chunk_ids()
+    finally:
+        queue.close()
+
+    flights = 0
+    with open(merged_path, "w", newline="") as merged:
+        merged.write(",".join(OUTPUT_FIELDS) + "\n")
+        for chunk_id in chunk_ids:
+            path = chunk_output_path(output_dir, chunk_id)
+            with open(path, "r", newline="") as partial:
+                for line in partial:
+                    merged.write(line)
+                    flights += 1
+    return flights
+
+
+def _describe_failure(failure: dict[str, Any]) -> str:
+    """Returns one line describing a failed chunk."""
+    return (
+        f"Chunk {failure['id']} (routes {failure['first_route']}-"
+        f"{failure['last_route']}, {failure['attempts']} attempts): "
+        f"{failure['error']}"
+    )
+
+
+def read_routes(path: str) -> Iterable[dict[str, Any]]:
+    """
+    Yields routes from a CSV file with the ``ROUTE_FIELDS`` columns.
+    """
+    with open(path, "r", newline="") as file:
+        for row in csv.DictReader(file):
+            yield {
+                "dep_lat": float(row["dep_lat"]),
+                "dep_lon": float(row["dep_lon"]),
+                "arr_lat": float(row["arr_lat"]),
+                "arr_lon": float(row["arr_lon"]),
+                "aircraft": row["aircraft"],
+                "dep_icao": row.get("dep_icao") or None,
+                "arr_icao": row.get("arr_icao") or None,
+            }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Distributed batch calculation of flight parameters."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Load routes into a queue")
+    enqueue.add_argument("queue")
+    enqueue.add_argument("routes", help="CSV file with routes")
+    enqueue.add_argument("--chunk-size", type=int, default=10000)
+
+    worker = commands.add_parser("worker", help="Compute queued chunks")
+    worker.add_argument("queue")
+    worker.add_argument("output_dir")
+    worker.add_argument("--lease-seconds", type=float, default=300.0)
+    worker.add_argument("--distance-engine", default=None)
+    worker.add_argument("--max-attempts", type=int, default=3)
+    worker.add_argument("--poll-seconds", type=float, default=1.0)
+    worker.add_argument("--retry-seconds", type=float, default=30.0)
+
+    merge = commands.add_parser("merge", help="Combine chunk outputs")
+    merge.add_argument("queue")
+    merge.add_argument("output_dir")
+    merge.add_argument("merged")
+
+    status = commands.add_parser("status", help="Show chunk counts")
+    status.add_argument("queue")
+
+    retry = commands.add_parser("retry", help="Queue failed chunks again")
+    retry.add_argument("queue")
+
+    args = parser.parse_args(argv)
+    if args.command == "enqueue":
+        queue = WorkQueue(args.queue)
+        chunks = queue.enqueue(read_routes(args.routes), args.chunk_size)
+        queue.close()
+        print(f"Queued {chunks} chunks.")
+    elif args.command == "worker":
+        completed = run_worker(
+            args.queue,
+            args.output_dir,
+            lease_seconds=args.lease_seconds,
+            distance_engine=args.distance_engine,
+            max_attempts=args.max_attempts,
+            poll_seconds=args.poll_seconds,
+            retry_seconds=args.retry_seconds,
+        )
+        print(f"Completed {completed} chunks.")
+    elif args.command == "merge":
+        flights = merge_outputs(args.queue, args.output_dir, args.merged)
+        print(f"Merged {flights} flights.")
+    elif args.command == "retry":
+        queue = WorkQueue(args.queue)
+        print(f"Queued {queue.retry_failed()} failed chunks again.")
+        queue.close()
+    else:
+        queue = WorkQueue(args.queue)
+        print(queue.status())
+        for failure in queue.failures():
+            print(_describe_failure(failure))
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
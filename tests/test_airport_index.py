@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import MagicMock
+from src.models.airport import Airport
+from src.models.airport_index import AirportIndex, normalize_name
+
+AIRPORTS = [
+    {"icao": "ULLI", "iata": "LED", "name": "Pulkovo Airport",
+     "latitude": 59.800301, "longitude": 30.262501},
+    {"icao": "UUEE", "iata": "SVO",
+     "name": "Sheremetyevo International Airport",
+     "latitude": 55.972599, "longitude": 37.4146},
+    {"icao": "UUDD", "iata": "DME",
+     "name": "Domodedovo International Airport",
+     "latitude": 55.408798, "longitude": 37.9063},
+    {"icao": "LEMD", "iata": "MAD", "name": "Adolfo Suárez Madrid–Barajas",
+     "latitude": 40.471926, "longitude": -3.56264},
+]
+
+
+@pytest.fixture
+def index():
+    return AirportIndex(AIRPORTS)
+
+
+def test_normalize_name():
+    assert normalize_name("Adolfo Suárez Madrid–Barajas") == (
+        "adolfo suarez madrid barajas"
+    )
+
+
+@pytest.mark.parametrize(
+    "identifier",
+    ["ulli", "ULLI", " led ", "Pulkovo Airport", "pulkovo airport"],
+)
+def test_resolve(index, identifier):
+    assert index.resolve(identifier) == "ULLI"
+
+
+def test_resolve_unknown(index):
+    with pytest.raises(
+        ValueError, match="The airport with ICAO code XXXX does not exist."
+    ):
+        index.resolve("XXXX")
+
+
+def test_get_unknown(index):
+    assert index.get("Pulkovo") is None
+
+
+def test_ambiguous_identifiers():
+    index = AirportIndex([
+        {"icao": "KAAA", "iata": "AAA", "name": "Municipal Airport"},
+        {"icao": "KBBB", "iata": "AAA", "name": "Municipal Airport"},
+        {"icao": "KCCC", "iata": "CCC", "name": "Regional Airport"},
+    ])
+
+    for identifier in ("municipal airport", "aaa"):
+        assert index.get(identifier) is None
+        assert [a["icao"] for a in index.matches(identifier)] == [
+            "KAAA", "KBBB"
+        ]
+        with pytest.raises(
+            ValueError,
+            match=f"The airport identifier {identifier} is ambiguous: "
+            "KAAA, KBBB.",
+        ):
+            index.resolve(identifier)
+    assert index.resolve("kbbb") == "KBBB"
+    assert index.resolve("Regional Airport") == "KCCC"
+
+
+def test_autocomplete_codes(index):
+    assert [a["icao"] for a in index.autocomplete("uu")] == ["UUDD", "UUEE"]
+    assert [a["icao"] for a in index.autocomplete("SV")] == ["UUEE"]
+
+
+def test_autocomplete_names(index):
+    icaos = [a["icao"] for a in index.autocomplete("internat")]
+    assert sorted(icaos) == ["UUDD", "UUEE"]
+    assert [a["icao"] for a in index.autocomplete("dom inter")] == ["UUDD"]
+    assert [a["icao"] for a in index.autocomplete("suarez")] == ["LEMD"]
+
+
+def test_autocomplete_limit(index):
+    assert len(index.autocomplete("u", limit=1)) == 1
+
+
+def test_from_csv_ourairports_layout(tmp_path):
+    path = tmp_path / "airports.csv"
+    path.write_text(
+        "ident,type,name,latitude_deg,longitude_deg,"
+        "iata_code,icao_code,gps_code\n"
+        "ULLI,large_airport,Pulkovo Airport,59.800301,30.262501,"
+        "LED,ULLI,ULLI\n"
+        "GB-0001,small_airport,Gps Field,1.0,1.0,,,EGXY\n"
+        "US-0001,heliport,Local Pad,1.0,1.0,,,00AK\n"
+        "00AL,small_airport,Ident Only,1.0,1.0,,,\n"
+        "UUMU,closed,Closed Field,1.0,1.0,,UUMU,UUMU\n",
+        encoding="utf-8",
+    )
+    index = AirportIndex.from_csv(str(path))
+
+    assert len(index) == 2
+    assert index.get("led")["latitude"] == 59.800301
+    assert index.get("EGXY")["name"] == "Gps Field"
+    for identifier in ("GB-0001", "US-0001", "00AK", "00AL", "UUMU"):
+        assert index.get(identifier) is None
+
+
+def test_from_csv_missing_file(tmp_path):
+    with pytest.raises(IOError, match="Error reading airport data"):
+        AirportIndex.from_csv(str(tmp_path / "missing.csv"))
+
+
+def test_airport_resolves_before_api_call(index):
+    api_client = MagicMock()
+    api_client.get_metar.return_value = {
+        "data": [{
+            "icao": "ULLI",
+            "station": {"geometry": {"coordinates": [30.262501, 59.800301]}},
+        }]
+    }
+
+    airport = Airport("led", api_client=api_client, airport_index=index)
+
+    api_client.get_metar.assert_called_once_with("ULLI")
+    assert airport.icao_code == "ULLI"
+
+
+def test_airport_unknown_skips_api_call(index):
+    api_client = MagicMock()
+    with pytest.raises(ValueError, match="does not exist"):
+        Airport("XXXX", api_client=api_client, airport_index=index)
+    api_client.get_metar.assert_not_called()
@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+from src.models.distance import (
+    DistanceEngine,
+    HaversineEngine,
+    UnitVectorEngine,
+    VincentyEngine,
+    get_distance_engine,
+)
+from src.models.flight_batch import FlightBatch
+
+ULLI = (59.800301, 30.262501)
+UUEE = (55.972599, 37.4146)
+
+
+def test_haversine_engine_distance():
+    distance_km = HaversineEngine().distance_km(*ULLI, *UUEE)
+    assert distance_km == pytest.approx(599.289, abs=1e-3)
+
+
+def test_unit_vector_engine_matches_haversine():
+    rng = np.random.default_rng(7)
+    points = [
+        rng.uniform(-90, 90, 1000), rng.uniform(-180, 180, 1000),
+        rng.uniform(-90, 90, 1000), rng.uniform(-180, 180, 1000),
+    ]
+    expected = HaversineEngine().distances_km(*points)
+    distances = UnitVectorEngine().distances_km(*points)
+    assert distances == pytest.approx(expected, rel=1e-9)
+
+
+def test_unit_vector_engine_caches_airports():
+    engine = UnitVectorEngine()
+    engine.distance_km(*ULLI, *UUEE)
+    engine.distance_km(*UUEE, *ULLI)
+    assert set(engine._vectors) == {ULLI, UUEE}
+
+
+def test_unit_vector_engine_cache_is_bounded():
+    engine = UnitVectorEngine(cache_size=2)
+    engine.distance_km(*ULLI, *UUEE)
+    engine.distance_km(0, 0, *UUEE)
+    assert set(engine._vectors) == {UUEE, (0, 0)}
+
+
+def test_unit_vector_engine_route_distances():
+    engine = UnitVectorEngine()
+    lat = np.array([ULLI[0], UUEE[0]])
+    lon = np.array([ULLI[1], UUEE[1]])
+    distances = engine.route_distances_km(lat, lon, [0, 1, 0], [1, 0, 0])
+
+    assert engine._vectors == {}
+    assert distances == pytest.approx(
+        [HaversineEngine().distance_km(*ULLI, *UUEE)] * 2 + [0.0]
+    )
+
+
+def test_vincenty_engine_reference_distance():
+    distance_km = VincentyEngine().distance_km(
+        -37.95103342, 144.42486789, -37.65282114, 143.92649554
+    )
+    assert distance_km == pytest.approx(54.972271, abs=1e-6)
+
+
+def test_vincenty_engine_meridian_arc():
+    distance_km = VincentyEngine().distance_km(90, 0, -90, 0)
+    assert distance_km == pytest.approx(20003.931, abs=1e-3)
+
+
+def test_vincenty_engine_antipodal_fallback():
+    distance_km = VincentyEngine().distance_km(0, 0, 0, 180)
+    assert np.isfinite(distance_km)
+    assert distance_km == pytest.approx(20003.9, rel=1e-3)
+
+
+def test_engine_validates_coordinates():
+    with pytest.raises(
+        ValueError, match="Latitude must be between -90 and 90 degrees."
+    ):
+        VincentyEngine().distance_km(91, 0, 0, 0)
+
+
+def test_distance_engine_is_abstract():
+    with pytest.raises(TypeError):
+        DistanceEngine()
+
+
+def test_get_distance_engine():
+    assert isinstance(get_distance_engine(), HaversineEngine)
+    assert isinstance(get_distance_engine("vincenty"), VincentyEngine)
+    assert get_distance_engine("unit_vector") is get_distance_engine(
+        "unit_vector"
+    )
+    engine = UnitVectorEngine()
+    assert get_distance_engine(engine) is engine
+    with pytest.raises(ValueError, match="Unknown distance engine: flat"):
+        get_distance_engine("flat")
+
+
+def test_batch_uses_distance_engine():
+    batch = FlightBatch(
+        [ULLI[0]], [ULLI[1]], [UUEE[0]], [UUEE[1]],
+        "b738", distance_engine="vincenty",
+    )
+    expected = VincentyEngine().distance_km(*ULLI, *UUEE)
+    assert batch.distance_km[0] == pytest.approx(expected)
+
+
+def test_batch_from_airports():
+    engine = UnitVectorEngine()
+    batch = FlightBatch.from_airports(
+        [ULLI[0], UUEE[0]], [ULLI[1], UUEE[1]], [0, 1], [1, 0],
+        "b738", airport_icao=["ULLI", "UUEE"], distance_engine=engine,
+    )
+    reference = FlightBatch(
+        [ULLI[0], UUEE[0]], [ULLI[1], UUEE[1]],
+        [UUEE[0], ULLI[0]], [UUEE[1], ULLI[1]], "b738",
+    )
+
+    assert batch.dep_icao == ["ULLI", "UUEE"]
+    assert batch.arr_icao == ["UUEE", "ULLI"]
+    assert batch.estimated_tow.tolist() == reference.estimated_tow.tolist()
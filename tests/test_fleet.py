@@ -0,0 +1,88 @@
+import pytest
+from src.models.distance import HaversineEngine
+from src.models.fleet import assign_fleet, available_aircraft, spare_payload
+from src.models.flight_batch import FlightBatch
+
+ULLI = (59.800301, 30.262501)
+UUEE = (55.972599, 37.4146)
+KJFK = (40.639801, -73.7789)
+
+
+def _routes(*routes):
+    return (
+        [dep[0] for dep, _ in routes],
+        [dep[1] for dep, _ in routes],
+        [arr[0] for _, arr in routes],
+        [arr[1] for _, arr in routes],
+    )
+
+
+def test_available_aircraft():
+    assert available_aircraft() == ["a320", "b738", "b739"]
+
+
+def test_assign_fleet_ranks_by_block_fuel():
+    assignments = assign_fleet(*_routes((ULLI, UUEE)))
+
+    batch = FlightBatch(
+        *_routes((ULLI, UUEE), (ULLI, UUEE), (ULLI, UUEE)),
+        ["a320", "b738", "b739"], [0, 1, 2],
+    )
+    expected = [
+        batch.aircraft_types[batch.aircraft_index[i]]
+        for i in sorted(range(3), key=lambda i: batch.block_fuel[i])
+        if batch.valid[i]
+    ]
+    ranked = [option["aircraft"] for option in assignments[0]]
+    assert ranked == expected
+
+
+def test_assign_fleet_ranks_by_spare_payload():
+    assignments = assign_fleet(
+        *_routes((ULLI, UUEE)), ["b738", "b739"], rank_by="spare_payload"
+    )
+    spare = [option["spare_payload_kg"] for option in assignments[0]]
+    assert spare == sorted(spare, reverse=True)
+
+
+def test_assign_fleet_excludes_routes_out_of_range():
+    assignments = assign_fleet(
+        *_routes((ULLI, KJFK), (ULLI, UUEE)), ["b738"]
+    )
+    assert assignments[0] == []
+    assert assignments[1][0]["aircraft"] == "b738"
+
+
+def test_assign_fleet_chunks_match_single_pass():
+    routes = _routes((ULLI, UUEE), (UUEE, ULLI), (ULLI, KJFK))
+    assert assign_fleet(*routes, chunk_size=1) == assign_fleet(*routes)
+
+
+def test_assign_fleet_invalid_ranking():
+    with pytest.raises(ValueError, match="rank_by must be one of"):
+        assign_fleet(*_routes((ULLI, UUEE)), rank_by="range")
+
+
+def test_spare_payload_respects_max_payload():
+    batch = FlightBatch(*_routes((ULLI, UUEE)), "b738")
+    assert spare_payload(batch).tolist() == [760]
+    assert spare_payload(batch, [19500]).tolist() == [
+        19500 - batch.payload[0]
+    ]
+
+
+def test_assign_fleet_measures_each_route_once():
+    class CountingEngine(HaversineEngine):
+        def __init__(self):
+            self.sizes = []
+
+        def distances_km(self, lat1, lon1, lat2, lon2):
+            self.sizes.append(len(lat1))
+            return super().distances_km(lat1, lon1, lat2, lon2)
+
+    engine = CountingEngine()
+    routes = _routes((ULLI, UUEE), (UUEE, ULLI))
+    assert assign_fleet(*routes, distance_engine=engine) == assign_fleet(
+        *routes
+    )
+    assert engine.sizes == [2]
@@ -0,0 +1,151 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from src.models.aircraft import Aircraft
+from src.models.distance import HaversineEngine
+from src.models.flight import Flight
+from src.models.flight_batch import FlightBatch, Violation
+
+AIRCRAFT_TYPES = ["b738", "b739", "a320"]
+
+
+@pytest.fixture
+def profiles():
+    return {icao: Aircraft(icao).data[icao] for icao in AIRCRAFT_TYPES}
+
+
+@pytest.fixture
+def routes():
+    rng = np.random.default_rng(42)
+    size = 2000
+    return (
+        rng.uniform(-90, 90, size),
+        rng.uniform(-180, 180, size),
+        rng.uniform(-90, 90, size),
+        rng.uniform(-180, 180, size),
+        rng.integers(0, len(AIRCRAFT_TYPES), size),
+    )
+
+
+def _reference_flight(aircraft_data, dep_lat, dep_lon, arr_lat, arr_lon):
+    flight = Flight.__new__(Flight)
+    flight.aircraft_data = aircraft_data
+    flight.distance_engine = HaversineEngine()
+    flight.dep_airport = SimpleNamespace(latitude=dep_lat, longitude=dep_lon)
+    flight.arr_airport = SimpleNamespace(latitude=arr_lat, longitude=arr_lon)
+    flight.calculate_flight_params()
+    return flight
+
+
+def test_batch_matches_flight(routes, profiles):
+    dep_lat, dep_lon, arr_lat, arr_lon, index = routes
+    batch = FlightBatch(
+        dep_lat, dep_lon, arr_lat, arr_lon,
+        AIRCRAFT_TYPES, index, profiles=profiles,
+    )
+
+    for i in range(len(batch)):
+        aircraft_data = profiles[AIRCRAFT_TYPES[index[i]]]
+        try:
+            flight = _reference_flight(
+                aircraft_data,
+                float(dep_lat[i]), float(dep_lon[i]),
+                float(arr_lat[i]), float(arr_lon[i]),
+            )
+        except ValueError:
+            assert not batch.valid[i]
+            continue
+
+        assert batch.valid[i]
+        assert int(batch.distance_km[i]) == int(flight.distance_km)
+        assert int(batch.block_fuel[i]) == int(flight.block_fuel)
+        assert batch.payload[i] == flight.payload
+        assert int(batch.cargo[i]) == int(flight.cargo)
+        assert batch.estimated_zfw[i] == flight.estimated_zfw
+        assert batch.estimated_tow[i] == flight.estimated_tow
+        assert batch.estimated_lw[i] == flight.estimated_lw
+
+
+def test_violation_masks_instead_of_exceptions(profiles):
+    profiles["b738"] = dict(profiles["b738"], TOW={"MAX": 1})
+    batch = FlightBatch(
+        [59.800301, 0.0], [30.262501, 0.0],
+        [55.972599, 0.0], [37.4146, 0.0],
+        "b738", profiles=profiles,
+    )
+
+    assert batch.tow_exceeded.all()
+    assert not batch.zfw_exceeded.any()
+    assert (batch.violations & Violation.TOW).all()
+    assert not batch.valid.any()
+
+
+def test_invalid_coordinates_are_flagged(profiles):
+    batch = FlightBatch(
+        [91.0, 59.800301], [0.0, 30.262501],
+        [0.0, 55.972599], [0.0, 37.4146],
+        "b738", profiles=profiles,
+    )
+
+    assert batch.violations[0] == Violation.COORDINATES
+    assert batch.distance_km[0] == 0.0
+    assert batch.valid[1]
+
+
+def test_aircraft_codes_per_flight(profiles):
+    batch = FlightBatch(
+        [59.800301] * 3, [30.262501] * 3,
+        [55.972599] * 3, [37.4146] * 3,
+        ["b739", "a320", "b739"], profiles=profiles,
+    )
+
+    assert batch.aircraft_types == ["a320", "b739"]
+    assert batch.aircraft_index.tolist() == [1, 0, 1]
+    assert batch._to_dict(1)["aircraft"] == "a320"
+
+
+def test_coordinate_length_mismatch():
+    with pytest.raises(
+        ValueError, match="Coordinate arrays must have the same length."
+    ):
+        FlightBatch([0.0, 1.0], [0.0], [0.0], [0.0], "b738")
+
+
+def test_aircraft_index_out_of_range(profiles):
+    with pytest.raises(ValueError, match="Aircraft index is out of range."):
+        FlightBatch(
+            [0.0], [0.0], [1.0], [1.0],
+            ["b738"], [1], profiles=profiles,
+        )
+
+
+def test_missing_profile_data(profiles):
+    del profiles["b738"]["LW"]
+    with pytest.raises(ValueError, match="LW data for aircraft is missing."):
+        FlightBatch([0.0], [0.0], [1.0], [1.0], "b738", profiles=profiles)
+
+
+def test_antipodal_routes_have_finite_weights(profiles):
+    rng = np.random.default_rng(5)
+    dep_lat = rng.uniform(-60, 60, 20000)
+    dep_lon = rng.uniform(-180, 0, 20000)
+    batch = FlightBatch(
+        dep_lat, dep_lon, -dep_lat, dep_lon + 180,
+        "b738", profiles=profiles,
+    )
+
+    assert np.isfinite(batch.distance_km).all()
+    assert (batch.estimated_tow > 0).all()
+    assert not batch.invalid_coordinates.any()
+    for i in range(0, 20000, 1000):
+        flight = Flight.__new__(Flight)
+        flight.distance_engine = HaversineEngine()
+        flight.dep_airport = SimpleNamespace(
+            latitude=float(dep_lat[i]), longitude=float(dep_lon[i])
+        )
+        flight.arr_airport = SimpleNamespace(
+            latitude=float(-dep_lat[i]), longitude=float(dep_lon[i] + 180)
+        )
+        assert int(batch.distance_km[i]) == int(
+            flight.calculate_distance_km()
+        )
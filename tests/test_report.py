@@ -0,0 +1,128 @@
+import io
+import pytest
+import numpy as np
+from src.models.flight_batch import FlightBatch
+from src.models.report import (
+    ReportRenderer,
+    TEMPLATES,
+    batch_records,
+    compile_format,
+)
+
+
+@pytest.fixture
+def batch():
+    return FlightBatch(
+        [59.800301, 55.972599, 59.800301],
+        [30.262501, 37.4146, 30.262501],
+        [55.972599, 59.800301, 55.972599],
+        [37.4146, 30.262501, 37.4146],
+        "b738",
+        dep_icao=["ULLI", "UUEE", "ULLI"],
+        arr_icao=["UUEE", "ULLI", "UUEE"],
+    )
+
+
+def _render(batch, **kwargs):
+    output = io.StringIO()
+    ReportRenderer(**kwargs).render_batch(batch, output)
+    return output.getvalue()
+
+
+def test_text_template_matches_print_flight_params(batch):
+    record = next(batch_records(batch))
+    assert TEMPLATES["text"].flight.format_map(record) == (
+        "\nAircraft: b738 "
+        "\nULLI lat:59.800301, lon:30.262501 "
+        "\nUUEE lat:55.972599, lon:37.4146 "
+        "\nDistance: 599 km\n "
+        "\nPassengers [max]: 184 "
+        "\nBlock Fuel: 6992 kg "
+        "\nPayload: 19136 kg "
+        "\nCargo: 4784 kg\n "
+        "\nZFW est:60818, max:62732 "
+        "\nTOW est:67809, max:79016 "
+        "\nLW est:65601, max:66361\n\n"
+    )
+
+
+def test_render_summary_totals(batch):
+    report = _render(batch, template="text")
+    assert report.count("Aircraft: b738") == 3
+    assert report.endswith(
+        "\nFlights: 3 \nDistance: 1798 km \nBlock Fuel: 20975 kg "
+        "\nPayload: 57408 kg \nCargo: 14352 kg\n"
+    )
+
+
+def test_render_grouped_by_departure(batch):
+    report = _render(batch, template="markdown", group_by="departure")
+    assert report.startswith("# Flight briefing\n\n## ULLI\n")
+    assert report.index("## ULLI") < report.index("## UUEE")
+    assert report.count("**Flights:** 2") == 1
+    assert report.count("**Flights:** 1") == 1
+    assert report.count("**Flights:** 3") == 1
+    assert report.count("| b738 | ULLI | UUEE |") == 2
+
+
+def test_render_without_summary(batch):
+    report = _render(batch, template="markdown", summary=False)
+    assert "**Flights:**" not in report
+    assert report.count("| b738 |") == 3
+
+
+def test_render_html_escapes_codes(batch):
+    batch.dep_icao = ["<b>", "UUEE", "<b>"]
+    report = _render(batch, template="html", group_by="departure")
+    assert "<h2>&lt;b&gt;</h2>" in report
+    assert "<td>&lt;b&gt;</td>" in report
+    assert report.count("<table>") == report.count("</table>") == 2
+    assert report.endswith("</body>\n</html>\n")
+
+
+def test_unknown_template():
+    with pytest.raises(ValueError, match="Unknown report template: pdf"):
+        ReportRenderer("pdf")
+
+
+def test_unknown_group():
+    with pytest.raises(ValueError, match="group_by must be either"):
+        ReportRenderer(group_by="aircraft")
+
+
+def test_batch_records_in_slices(batch, monkeypatch):
+    monkeypatch.setattr("src.models.report.BUFFER_SIZE", 2)
+    records = list(batch_records(batch, np.array([2, 1, 0])))
+
+    assert [record["dep_icao"] for record in records] == [
+        "ULLI", "UUEE", "ULLI"
+    ]
+    assert [record["tow_est"] for record in records] == (
+        batch.estimated_tow[[2, 1, 0]].tolist()
+    )
+    assert len(list(batch_records(batch))) == 3
+
+
+def test_compiled_templates_match_format_map(batch):
+    record = next(batch_records(batch))
+    for template in TEMPLATES.values():
+        assert template.format_flight(record) == (
+            template.flight.format_map(record)
+        )
+    format_record = compile_format("{{{aircraft!r}}} {distance_km:>8.1f}")
+    assert format_record(record) == "{'b738'}    599.3"
+
+
+def test_render_unordered_groups():
+    records = [
+        {"aircraft": "b738", "dep_icao": code, "arr_icao": "UUEE",
+         "distance_km": 1, "passengers": 1, "block_fuel": 1,
+         "payload": 1, "cargo": 1, "zfw_est": 1, "zfw_max": 1,
+         "tow_est": 1, "tow_max": 1, "lw_est": 1, "lw_max": 1}
+        for code in ("ULLI", "UUEE", "ULLI")
+    ]
+    renderer = ReportRenderer("markdown", group_by="departure")
+    with pytest.raises(
+        ValueError, match="ULLI appears again after its group"
+    ):
+        renderer.render(records, io.StringIO())
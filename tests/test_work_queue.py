@@ -0,0 +1,252 @@
+import csv
+import multiprocessing
+import time
+import pytest
+import numpy as np
+from src.models import work_queue
+from src.models.flight_batch import FlightBatch
+from src.models.work_queue import (
+    OUTPUT_FIELDS,
+    WorkQueue,
+    merge_outputs,
+    run_worker,
+)
+
+
+@pytest.fixture
+def routes():
+    rng = np.random.default_rng(3)
+    aircraft = ["b738", "b739", "a320"]
+    return [
+        {
+            "dep_lat": float(rng.uniform(40, 60)),
+            "dep_lon": float(rng.uniform(20, 40)),
+            "arr_lat": float(rng.uniform(40, 60)),
+            "arr_lon": float(rng.uniform(20, 40)),
+            "aircraft": aircraft[i % 3],
+            "dep_icao": "ULLI",
+            "arr_icao": "UUEE",
+        }
+        for i in range(250)
+    ]
+
+
+@pytest.fixture
+def queue_path(tmp_path, routes):
+    path = str(tmp_path / "queue.db")
+    queue = WorkQueue(path)
+    queue.enqueue(routes, chunk_size=20)
+    queue.close()
+    return path
+
+
+def _read_merged(path):
+    with open(path, newline="") as file:
+        return list(csv.DictReader(file))
+
+
+def test_enqueue_splits_into_chunks(queue_path):
+    queue = WorkQueue(queue_path)
+    assert queue.status() == {
+        "pending": 13, "leased": 0, "done": 0, "failed": 0
+    }
+    assert len(queue.routes(queue.claim("worker"))) == 20
+    queue.close()
+
+
+def test_enqueue_twice(queue_path, routes):
+    queue = WorkQueue(queue_path)
+    with pytest.raises(ValueError, match="already contains routes"):
+        queue.enqueue(routes)
+    queue.close()
+
+
+def test_workers_in_processes(queue_path, tmp_path, routes):
+    output_dir = str(tmp_path / "output")
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(queue_path, output_dir, f"worker-{i}"),
+            kwargs={"poll_seconds": 0.1},
+        )
+        for i in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    merged = str(tmp_path / "merged.csv")
+    assert merge_outputs(queue_path, output_dir, merged) == len(routes)
+
+    rows = _read_merged(merged)
+    assert list(rows[0]) == list(OUTPUT_FIELDS)
+    batch = FlightBatch(
+        [route["dep_lat"] for route in routes],
+        [route["dep_lon"] for route in routes],
+        [route["arr_lat"] for route in routes],
+        [route["arr_lon"] for route in routes],
+        [route["aircraft"] for route in routes],
+    )
+    assert [int(row["route_id"]) for row in rows] == list(
+        range(1, len(routes) + 1)
+    )
+    assert [int(row["tow_est"]) for row in rows] == (
+        batch.estimated_tow.tolist()
+    )
+    assert [int(row["violations"]) for row in rows] == (
+        batch.violations.tolist()
+    )
+
+
+def test_expired_lease_is_retried(queue_path):
+    queue = WorkQueue(queue_path, lease_seconds=-1)
+    chunk = queue.claim("slow-worker")
+
+    retried = queue.claim("fast-worker")
+    assert retried["id"] == chunk["id"]
+    assert queue.complete(retried["id"], "fast-worker")
+    assert not queue.complete(chunk["id"], "slow-worker")
+    queue.close()
+
+
+def test_completed_chunks_are_skipped_on_restart(queue_path, tmp_path):
+    output_dir = str(tmp_path / "output")
+    assert run_worker(queue_path, output_dir, "first") == 13
+    assert run_worker(queue_path, output_dir, "second") == 0
+
+
+def test_merge_with_pending_chunks(queue_path, tmp_path):
+    with pytest.raises(ValueError, match="Not all chunks are done"):
+        merge_outputs(queue_path, str(tmp_path), str(tmp_path / "out.csv"))
+
+
+def test_failed_chunk_does_not_stop_worker(tmp_path, routes):
+    routes[25]["aircraft"] = "x999"
+    queue_path = str(tmp_path / "queue.db")
+    queue = WorkQueue(queue_path)
+    queue.enqueue(routes, chunk_size=20)
+    queue.close()
+
+    output_dir = str(tmp_path / "output")
+    assert run_worker(
+        queue_path, output_dir, "worker", retry_seconds=0
+    ) == 12
+
+    queue = WorkQueue(queue_path)
+    assert queue.status()["failed"] == 1
+    [failure] = queue.failures()
+    assert failure["id"] == 2
+    assert failure["attempts"] == 3
+    assert "x999" in failure["error"]
+    queue.close()
+
+    with pytest.raises(ValueError, match="1 failed.\nChunk 2 .*x999"):
+        merge_outputs(queue_path, output_dir, str(tmp_path / "out.csv"))
+
+
+def test_chunk_with_transient_error_is_retried(
+    queue_path, tmp_path, monkeypatch
+):
+    replace = work_queue.os.replace
+    errors = []
+
+    def flaky_replace(source, destination):
+        if not errors:
+            errors.append(destination)
+            raise OSError("Output directory unavailable")
+        replace(source, destination)
+
+    monkeypatch.setattr(work_queue.os, "replace", flaky_replace)
+    output_dir = tmp_path / "output"
+    assert run_worker(
+        queue_path, str(output_dir), "worker", retry_seconds=0.2
+    ) == 13
+
+    queue = WorkQueue(queue_path)
+    assert queue.status()["done"] == 13
+    assert queue.failures() == []
+    queue.close()
+    assert len(errors) == 1
+    assert not list(output_dir.glob("*.tmp"))
+
+
+def test_error_waits_for_retry(queue_path):
+    queue = WorkQueue(queue_path, retry_seconds=60)
+    chunk = queue.claim("worker")
+    assert queue.fail(chunk["id"], "worker", "OSError: unavailable")
+
+    assert queue.status()["pending"] == 13
+    assert queue.claim("worker")["id"] == chunk["id"] + 1
+    assert queue.next_claim_time() > time.time() + 30
+    queue.close()
+
+
+def test_chunk_fails_after_max_attempts(queue_path):
+    queue = WorkQueue(queue_path, lease_seconds=-1, max_attempts=2)
+    assert queue.claim("first")["id"] == 1
+    assert queue.claim("second")["id"] == 1
+    assert queue.claim("third")["id"] == 2
+
+    [failure] = queue.failures()
+    assert failure["id"] == 1
+    assert failure["error"] == "Lease expired after 2 attempts."
+    assert not queue.complete(1, "second")
+
+    assert queue.retry_failed() == 1
+    assert queue.status()["pending"] == 12
+    queue.close()
+
+
+def test_renew_lease(queue_path):
+    queue = WorkQueue(queue_path, lease_seconds=60)
+    chunk = queue.claim("worker")
+    expires = queue.next_claim_time()
+
+    time.sleep(0.01)
+    assert queue.renew(chunk["id"], "worker")
+    assert queue.next_claim_time() > expires
+    assert not queue.renew(chunk["id"], "other-worker")
+    queue.close()
+
+
+def test_worker_waits_for_leases_of_other_workers(queue_path, tmp_path):
+    queue = WorkQueue(queue_path, lease_seconds=0.5)
+    crashed = queue.claim("crashed-worker")
+    queue.close()
+
+    output_dir = str(tmp_path / "output")
+    assert run_worker(queue_path, output_dir, "survivor") == 13
+
+    queue = WorkQueue(queue_path)
+    assert queue.status()["done"] == 13
+    assert not queue.complete(crashed["id"], "crashed-worker")
+    queue.close()
+
+
+def test_long_chunk_keeps_its_lease(queue_path, tmp_path, monkeypatch):
+    process_chunk = work_queue.process_chunk
+    remaining = []
+
+    def slow_process_chunk(rows, *args):
+        if rows[0][0] == 1:
+            time.sleep(0.5)
+            queue = WorkQueue(queue_path)
+            remaining.append(queue.next_claim_time() - time.time())
+            queue.close()
+        process_chunk(rows, *args)
+
+    monkeypatch.setattr(work_queue, "process_chunk", slow_process_chunk)
+    output_dir = str(tmp_path / "output")
+    assert run_worker(
+        queue_path, output_dir, "worker", lease_seconds=0.3
+    ) == 13
+    assert remaining[0] > 0
+
+
+def test_queue_uses_rollback_journal(queue_path):
+    queue = WorkQueue(queue_path)
+    journal_mode = queue.connection.execute("PRAGMA journal_mode")
+    assert journal_mode.fetchone()[0] == "delete"
+    queue.close()